@@ -0,0 +1,236 @@
+import numpy as np
+import atexit
+import io
+import os
+import shutil
+import tempfile
+from numpy.polynomial import Polynomial
+
+from harness import Case, load_poc_module
+
+
+# Hot paths of the eight POCs. Each setup returns (args, elements), where
+# elements is what "elements per second" counts for that case.
+
+SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+FLOATS = ("float32", "float64")
+NUMERIC = ("int32", "int64", "float32", "float64")
+
+
+def _rng():
+    return np.random.default_rng(0)
+
+
+def _random(size, dtype):
+    rng = _rng()
+    if np.issubdtype(dtype, np.integer):
+        return rng.integers(0, 1_000_000, size, dtype=dtype)
+    return rng.random(size, dtype=dtype)
+
+
+def _vector(size, dtype):
+    return (_random(size, dtype),), size
+
+
+def _pair(size, dtype):
+    return (_random(size, dtype), _random(size, dtype)), size
+
+
+# operations-and-broadcasting-poc
+
+def _rows(size, dtype, cols=8):
+    data = _random(size // cols * cols, dtype).reshape(-1, cols)
+    return data, data.mean(axis=0), data.std(axis=0)
+
+
+def _normalize_setup(size, dtype):
+    data, mean, std = _rows(size, dtype)
+    return (data, mean, std), data.size
+
+
+def _fused_setup(size, dtype):
+    data, mean, std = _rows(size, dtype)
+    return (data, mean, std, np.empty_like(data)), data.size
+
+
+_lazy = load_poc_module("operations-and-broadcasting-poc", "lazy_expr")
+
+
+def _fused_normalize(data, mean, std, out):
+    _lazy.evaluate((_lazy.lazy(data) - mean) / std, out=out)
+
+
+OPERATIONS = [
+    Case("operations-and-broadcasting-poc", "add", _pair, np.add, SIZES, NUMERIC),
+    Case("operations-and-broadcasting-poc", "normalize_eager", _normalize_setup,
+         lambda d, m, s: (d - m) / s, SIZES, FLOATS),
+    Case("operations-and-broadcasting-poc", "normalize_fused", _fused_setup, _fused_normalize, SIZES, FLOATS),
+]
+
+
+# indexing-slicing-poc
+
+def _fancy_setup(size, dtype):
+    a = _random(size, dtype)
+    idx = _rng().integers(0, size, size)
+    return (a, idx), size
+
+
+def _mask_setup(size, dtype):
+    a = _random(size, dtype)
+    return (a, _rng().random(size) < 0.5), size
+
+
+INDEXING = [
+    Case("indexing-slicing-poc", "strided_slice_copy", _vector, lambda a: a[::2].copy(), SIZES, NUMERIC),
+    Case("indexing-slicing-poc", "boolean_mask", _mask_setup, lambda a, m: a[m], SIZES, NUMERIC),
+    Case("indexing-slicing-poc", "fancy_take", _fancy_setup, lambda a, i: a[i], SIZES, NUMERIC),
+]
+
+
+# sorting-searching-poc
+
+def _search_setup(size, dtype):
+    a = np.sort(_random(size, dtype))
+    return (a, _random(size, dtype)), size
+
+
+SORTING = [
+    Case("sorting-searching-poc", "sort", _vector, np.sort, SIZES, NUMERIC),
+    Case("sorting-searching-poc", "argsort_stable", _vector, lambda a: np.argsort(a, kind="stable"),
+         SIZES, NUMERIC),
+    Case("sorting-searching-poc", "searchsorted", _search_setup, np.searchsorted, SIZES, NUMERIC),
+    Case("sorting-searching-poc", "top10_argpartition", _vector, lambda a: np.argpartition(a, -10)[-10:],
+         SIZES, NUMERIC),
+]
+
+
+# linear-algebra-poc: size is the matrix edge, elements the multiply-adds (n^3)
+
+def _square_setup(n, dtype):
+    rng = _rng()
+    A = rng.random((n, n)).astype(dtype) + n * np.eye(n, dtype=dtype)
+    return (A, rng.random((n, n)).astype(dtype)), n ** 3
+
+
+def _batched_setup(size, dtype):
+    rng = _rng()
+    A = rng.random((size, 3, 3)).astype(dtype) + 3 * np.eye(3, dtype=dtype)
+    return (A, rng.random((size, 3)).astype(dtype)), size
+
+
+_batched = load_poc_module("linear-algebra-poc", "batched")
+
+LINALG = [
+    Case("linear-algebra-poc", "matmul", _square_setup, np.matmul, [64, 256, 1_024], FLOATS),
+    Case("linear-algebra-poc", "solve", _square_setup, np.linalg.solve, [64, 256, 1_024], ("float64",)),
+    Case("linear-algebra-poc", "batched_solve_3x3", _batched_setup, _batched.solve,
+         [1_000, 100_000, 1_000_000], ("float64",)),
+    Case("linear-algebra-poc", "np_linalg_solve_3x3", _batched_setup,
+         lambda A, b: np.linalg.solve(A, b[..., None]), [1_000, 100_000, 1_000_000], ("float64",)),
+]
+
+
+# masked-arrays-poc
+
+def _masked_setup(size, dtype):
+    a = _random(size, dtype)
+    return (np.ma.masked_less(a, a.dtype.type(a.max() // 10 if a.dtype.kind in "iu" else 0.1)),), size
+
+
+def _nan_setup(size, dtype):
+    a = _random(size, dtype)
+    a[a < 0.1] = np.nan
+    return (a,), size
+
+
+MASKED = [
+    Case("masked-arrays-poc", "ma_mean", _masked_setup, lambda m: m.mean(), SIZES[:3], NUMERIC),
+    Case("masked-arrays-poc", "ma_filled", _masked_setup, lambda m: m.filled(0), SIZES[:3], NUMERIC),
+    Case("masked-arrays-poc", "nan_mean", _nan_setup, np.nanmean, SIZES[:3], FLOATS),
+]
+
+
+# polynomial-poc
+
+def _poly_eval_setup(size, dtype):
+    return (Polynomial([1, -3, 2, 0.5, -0.1]), _random(size, dtype)), size
+
+
+def _polyfit_setup(size, dtype):
+    x = np.linspace(-1, 1, size)
+    y = np.sin(3 * x) + 0.01 * _rng().normal(size=size)
+    return (x, y), size
+
+
+POLYNOMIAL = [
+    Case("polynomial-poc", "polynomial_eval_deg4", _poly_eval_setup, lambda p, x: p(x), SIZES[:3], FLOATS),
+    Case("polynomial-poc", "polynomial_fit_deg5", _polyfit_setup, lambda x, y: Polynomial.fit(x, y, 5),
+         SIZES[:3]),
+]
+
+
+# datetime-poc
+
+def _iso_setup(size, dtype):
+    ts = np.datetime64("2025-01-01T00:00:00") + _rng().integers(0, 365 * 86400, size).astype("timedelta64[s]")
+    return (ts.astype("U19"),), size
+
+
+def _busday_setup(size, dtype):
+    begins = np.datetime64("2024-01-01") + _rng().integers(0, 730, size).astype("timedelta64[D]")
+    return (begins, begins + _rng().integers(0, 400, size).astype("timedelta64[D]")), size
+
+
+def _resample_setup(size, dtype):
+    ts = np.datetime64("2025-01-01T00:00:00") + _rng().integers(0, 365 * 86400, size).astype("timedelta64[s]")
+    return (ts, _rng().random(size)), size
+
+
+_timestamps = load_poc_module("datetime-poc", "fast_timestamps")
+_resample = load_poc_module("datetime-poc", "resample")
+
+DATETIME = [
+    Case("datetime-poc", "parse_iso_astype", _iso_setup, lambda s: s.astype("datetime64[s]"), SIZES[:3]),
+    Case("datetime-poc", "parse_iso_fast", _iso_setup, _timestamps.parse_iso, SIZES[:3]),
+    Case("datetime-poc", "busday_count", _busday_setup, np.busday_count, SIZES[:3]),
+    Case("datetime-poc", "resample_hourly", _resample_setup, lambda t, v: _resample.resample(t, v, "h"),
+         SIZES[:3]),
+]
+
+
+# file-io-poc: round trips through an in-memory buffer and a temp file
+
+def _npy_roundtrip(a):
+    buf = io.BytesIO()
+    np.save(buf, a)
+    buf.seek(0)
+    return np.load(buf)
+
+
+_TMP = tempfile.mkdtemp(prefix="numpy-poc-bench-")
+atexit.register(shutil.rmtree, _TMP, ignore_errors=True)
+
+
+def _tofile_roundtrip(a):
+    path = os.path.join(_TMP, "raw.bin")
+    a.tofile(path)
+    return np.fromfile(path, dtype=a.dtype)
+
+
+def _text_setup(size, dtype):
+    a = _random(size, dtype).reshape(-1, 4)
+    buf = io.StringIO()
+    np.savetxt(buf, a, delimiter=",")
+    return (buf.getvalue(),), a.size
+
+
+FILE_IO = [
+    Case("file-io-poc", "npy_roundtrip", _vector, _npy_roundtrip, SIZES, NUMERIC),
+    Case("file-io-poc", "tofile_fromfile", _vector, _tofile_roundtrip, SIZES, NUMERIC),
+    Case("file-io-poc", "loadtxt", _text_setup, lambda s: np.loadtxt(io.StringIO(s), delimiter=","),
+         [1_000, 100_000], ("float64",)),
+]
+
+
+ALL = OPERATIONS + INDEXING + SORTING + LINALG + MASKED + POLYNOMIAL + DATETIME + FILE_IO
@@ -0,0 +1,172 @@
+import numpy as np
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+
+# Microbenchmark harness shared by every POC.
+#
+# A Case is a setup(size, dtype) -> (args, elements) function plus the timed
+# fn(*args). For every (size, dtype) in the sweep the harness
+#   1. runs setup outside the timer,
+#   2. warms up, then calibrates how many calls go into one sample so a sample
+#      lasts at least MIN_SAMPLE_NS (perf_counter_ns resolution and call
+#      overhead stop mattering for microsecond-scale ops),
+#   3. collects samples until both min_repeat and min_time are reached,
+#   4. reruns once under tracemalloc for the peak allocation of a single call.
+# Timing and tracing are kept apart because tracemalloc slows allocations down.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIN_SAMPLE_NS = 200_000
+
+
+class Case:
+    def __init__(self, poc, name, setup, fn, sizes, dtypes=(None,), quick_sizes=None):
+        self.poc = poc
+        self.name = name
+        self.setup = setup
+        self.fn = fn
+        self.sizes = sizes
+        self.dtypes = dtypes
+        self.quick_sizes = quick_sizes or sizes[:2]
+
+    @property
+    def key(self):
+        return f"{self.poc}/{self.name}"
+
+
+def load_poc_module(poc, name):
+    # POC folders have dashes in their names, so load their modules by path;
+    # the folder goes on sys.path for sibling imports (resample -> fast_timestamps)
+    directory = os.path.join(ROOT, poc)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    path = os.path.join(directory, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(f"{poc.replace('-', '_')}.{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _percentile(sorted_values, q):
+    return float(np.percentile(sorted_values, q))
+
+
+def measure(fn, args, elements, warmup=2, min_repeat=7, min_time=0.25, max_repeat=1_000):
+    for _ in range(warmup):
+        fn(*args)
+
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn(*args)
+        if time.perf_counter_ns() - start >= MIN_SAMPLE_NS or number >= 1 << 20:
+            break
+        number *= 4
+
+    samples = []
+    budget_ns = min_time * 1e9
+    spent = 0
+    while len(samples) < max_repeat and (len(samples) < min_repeat or spent < budget_ns):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn(*args)
+        elapsed = time.perf_counter_ns() - start
+        spent += elapsed
+        samples.append(elapsed / number)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    samples = np.sort(np.array(samples))
+    median = _percentile(samples, 50)
+    return {
+        "elements": int(elements),
+        "runs": len(samples),
+        "calls_per_run": number,
+        "median_ns": median,
+        "p95_ns": _percentile(samples, 95),
+        "min_ns": float(samples[0]),
+        "mean_ns": float(samples.mean()),
+        "elements_per_s": elements / (median / 1e9) if median > 0 else float("inf"),
+        "peak_bytes": int(peak),
+    }
+
+
+def run_case(case, quick=False, **measure_kwargs):
+    results = []
+    for size in (case.quick_sizes if quick else case.sizes):
+        for dtype in case.dtypes:
+            args, elements = case.setup(size, np.dtype(dtype) if dtype is not None else None)
+            stats = measure(case.fn, args, elements, **measure_kwargs)
+            results.append({"poc": case.poc, "name": case.name, "size": size,
+                            "dtype": np.dtype(dtype).name if dtype is not None else None, **stats})
+    return results
+
+
+def environment():
+    return {
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "argv": sys.argv,
+    }
+
+
+def save(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=1)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _result_key(r):
+    return r["poc"], r["name"], r["size"], r["dtype"]
+
+
+def compare(baseline, results, threshold=0.10):
+    # (result, baseline median / new median) pairs slower than the threshold allows
+    old = {_result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        before = old.get(_result_key(r))
+        if before is None:
+            continue
+        ratio = r["median_ns"] / before["median_ns"]
+        if ratio > 1 + threshold:
+            regressions.append((r, ratio))
+    return regressions
+
+
+def format_ns(ns):
+    for unit, scale in [("s", 1e9), ("ms", 1e6), ("us", 1e3)]:
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def format_row(r):
+    dtype = r["dtype"] or "-"
+    return (f"{r['poc']:32s} {r['name']:26s} {r['size']:>11,} {dtype:>14s} "
+            f"{format_ns(r['median_ns']):>10s} {format_ns(r['p95_ns']):>10s} "
+            f"{r['elements_per_s'] / 1e6:>11.1f} {r['peak_bytes'] / 2**20:>9.1f}")
+
+
+HEADER = (f"{'poc':32s} {'case':26s} {'size':>11s} {'dtype':>14s} {'median':>10s} {'p95':>10s} "
+          f"{'M elem/s':>11s} {'peak MiB':>9s}")
@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import harness  # noqa: E402
+from cases import ALL  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the NumPy POCs")
+    parser.add_argument("--poc", action="append", help="only run cases of this POC (repeatable, substring match)")
+    parser.add_argument("--case", action="append", help="only run cases whose name contains this (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="smallest two sizes only")
+    parser.add_argument("--min-time", type=float, default=0.25, help="seconds of samples per size/dtype")
+    parser.add_argument("--min-repeat", type=int, default=7)
+    parser.add_argument("--output", default=os.path.join(HERE, "results", f"numpy-{np.__version__}.json"))
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed median slowdown vs baseline")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in ALL
+             if (not args.poc or any(p in c.poc for p in args.poc))
+             and (not args.case or any(n in c.name for n in args.case))]
+    if args.list:
+        for c in cases:
+            print(f"{c.key:60s} sizes={c.sizes} dtypes={[d for d in c.dtypes if d]}")
+        return 0
+
+    print("=" * 40)
+    print("       NumPy POC Microbenchmarks")
+    print("=" * 40, "\n")
+    print(f"NumPy {np.__version__} | {len(cases)} cases | {'quick' if args.quick else 'full'} sweep\n")
+    print(harness.HEADER)
+
+    results = []
+    for case in cases:
+        for r in harness.run_case(case, quick=args.quick, min_time=args.min_time, min_repeat=args.min_repeat):
+            print(harness.format_row(r), flush=True)
+            results.append(r)
+
+    harness.save(args.output, results)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        regressions = harness.compare(harness.load(args.compare), results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} vs {args.compare}:")
+            for r, ratio in regressions:
+                print(f"  {r['poc']}/{r['name']} size={r['size']:,} dtype={r['dtype']}: {ratio:.2f}x slower")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%} vs {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
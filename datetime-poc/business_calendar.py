@@ -0,0 +1,191 @@
+import numpy as np
+import time
+
+
+# Business-day calendar built once from a weekmask + holidays.
+#
+# Inside [start, end) every day has a precomputed cumulative business-day
+# count, so busday_count is one subtraction and busday_offset one lookup into
+# the sorted list of business days, for any number of dates at once.
+# Dates outside the window fall back to np.busday_* with the same
+# np.busdaycalendar, so results always match NumPy.
+
+_FORWARD = ("forward", "following")
+_BACKWARD = ("backward", "preceding")
+
+
+class BusinessCalendar:
+    def __init__(self, start, end, weekmask="1111100", holidays=()):
+        self.start = np.datetime64(start, "D")
+        self.end = np.datetime64(end, "D")
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=np.asarray(holidays, dtype="datetime64[D]"))
+
+        days = np.arange(self.start, self.end, dtype="datetime64[D]")
+        self._is_bd = np.is_busday(days, busdaycal=self.busdaycal)
+        # _cum[i] = business days in [start, start + i)
+        self._cum = np.zeros(len(days) + 1, dtype=np.int64)
+        np.cumsum(self._is_bd, out=self._cum[1:])
+        self._bdays = days[self._is_bd]
+
+    @property
+    def weekmask(self):
+        return self.busdaycal.weekmask
+
+    @property
+    def holidays(self):
+        return self.busdaycal.holidays
+
+    def _index(self, dates):
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        return dates, (dates - self.start).astype(np.int64)
+
+    def is_busday(self, dates):
+        dates, i = self._index(dates)
+        inside = (i >= 0) & (i < len(self._is_bd))
+        if inside.all():
+            return self._is_bd[i]
+        result = np.is_busday(dates, busdaycal=self.busdaycal)
+        result[inside] = self._is_bd[i[inside]]
+        return result
+
+    def count(self, begindates, enddates):
+        begindates, b = self._index(begindates)
+        enddates, e = self._index(enddates)
+        b, e = np.broadcast_arrays(b, e)
+        # np.busday_count(b, e) with e < b is -count(e + 1, b + 1)
+        backwards = e < b
+        b, e = b + backwards, e + backwards
+        n = len(self._cum) - 1
+        inside = (b >= 0) & (b <= n) & (e >= 0) & (e <= n)
+        if inside.all():
+            return self._cum[e] - self._cum[b]
+
+        result = np.empty(b.shape, dtype=np.int64)
+        result[inside] = self._cum[e[inside]] - self._cum[b[inside]]
+        outside = ~inside
+        begindates, enddates = np.broadcast_arrays(begindates, enddates)
+        result[outside] = np.busday_count(begindates[outside], enddates[outside], busdaycal=self.busdaycal)
+        return result
+
+    def offset(self, dates, offsets=0, roll="raise"):
+        dates, i = self._index(dates)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        dates, i, offsets = np.broadcast_arrays(dates, i, offsets)
+        n = len(self._is_bd)
+        inside = (i >= 0) & (i < n)
+        ic = np.clip(i, 0, max(n - 1, 0))
+
+        if roll in _FORWARD or roll == "raise":
+            pos = self._cum[ic]
+        elif roll in _BACKWARD:
+            pos = self._cum[ic + 1] - 1
+        else:
+            # modifiedfollowing/modifiedpreceding/nat: defer to NumPy
+            return np.busday_offset(dates, offsets, roll=roll, busdaycal=self.busdaycal)
+
+        if roll == "raise" and n and not self._is_bd[ic[inside]].all():
+            raise ValueError("Non-business day date in busday_offset")
+
+        target = pos + offsets
+        inside &= (target >= 0) & (target < len(self._bdays))
+        if inside.all():
+            return self._bdays[target]
+
+        result = np.empty(dates.shape, dtype="datetime64[D]")
+        result[inside] = self._bdays[target[inside]]
+        outside = ~inside
+        result[outside] = np.busday_offset(dates[outside], offsets[outside], roll=roll, busdaycal=self.busdaycal)
+        return result
+
+    def roll(self, dates, roll="forward"):
+        return self.offset(dates, 0, roll=roll)
+
+
+def main():
+    print("=" * 40)
+    print("       Vectorized Business Calendar")
+    print("=" * 40, "\n")
+
+    # 1. Project timeline from main.py section 8, one call per question
+
+    print("--- Project Timeline ---\n")
+    project_start = np.datetime64("2025-06-02")
+    project_end = np.datetime64("2025-08-29")
+    company_holidays = np.array(["2025-07-04", "2025-07-05"], dtype="datetime64[D]")
+    cal = BusinessCalendar("2025-01-01", "2026-01-01", holidays=company_holidays)
+
+    effective_bd = cal.count(project_start, project_end)
+    print(f"Effective business days: {effective_bd} "
+          f"(np.busday_count: {np.busday_count(project_start, project_end, holidays=company_holidays)})")
+
+    total_bd = np.busday_count(project_start, project_end)
+    days = np.array([10, 25, 40, 55, total_bd])
+    print("Milestones:", cal.offset(project_start, days))
+
+    checks = np.array(["2025-06-14", "2025-06-15", "2025-07-04", "2025-06-18"], dtype="datetime64[D]")
+    print("Next business day:", cal.roll(checks), "| already busday:", cal.is_busday(checks))
+
+    months = np.arange("2025-06", "2025-09", dtype="datetime64[M]")
+    ms = np.maximum(months.astype("datetime64[D]"), project_start)
+    me = np.minimum((months + 1).astype("datetime64[D]"), project_end)
+    print("Monthly business days:", dict(zip(months.astype(str).tolist(), cal.count(ms, me).tolist())))
+    print()
+
+    # 2. Agreement with NumPy, including dates outside the precomputed window
+
+    print("--- Agreement with np.busday_* ---\n")
+
+    rng = np.random.default_rng(0)
+    n = 200_000
+    base = np.datetime64("2024-06-01")
+    a = base + rng.integers(0, 900, n).astype("timedelta64[D]")
+    b = base + rng.integers(0, 900, n).astype("timedelta64[D]")
+    k = rng.integers(-40, 40, n)
+    print("count matches:", np.array_equal(cal.count(a, b), np.busday_count(a, b, busdaycal=cal.busdaycal)))
+    for roll in ["forward", "backward", "modifiedfollowing"]:
+        same = np.array_equal(cal.offset(a, k, roll=roll), np.busday_offset(a, k, roll=roll, busdaycal=cal.busdaycal))
+        print(f"offset roll={roll!r} matches: {same}")
+    print()
+
+    # 3. Benchmark
+
+    print("--- Benchmark ---\n")
+
+    cal = BusinessCalendar("2000-01-01", "2040-01-01", holidays=company_holidays)
+    n = 2_000_000
+    base = np.datetime64("2010-01-01")
+    a = base + rng.integers(0, 5_000, n).astype("timedelta64[D]")
+    b = a + rng.integers(0, 2_000, n).astype("timedelta64[D]")
+    k = rng.integers(0, 500, n)
+
+    loop_n = 20_000
+    start = time.perf_counter()
+    for x, y in zip(a[:loop_n], b[:loop_n]):
+        np.busday_count(x, y, holidays=company_holidays)
+    loop_count = (time.perf_counter() - start) / loop_n
+    start = time.perf_counter()
+    for x, off in zip(a[:loop_n], k[:loop_n]):
+        np.busday_offset(x, off, roll="forward", holidays=company_holidays)
+    loop_offset = (time.perf_counter() - start) / loop_n
+
+    def timed(fn):
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) / n
+
+    rows = [
+        ("busday_count", loop_count,
+         timed(lambda: np.busday_count(a, b, holidays=company_holidays)),
+         timed(lambda: cal.count(a, b))),
+        ("busday_offset", loop_offset,
+         timed(lambda: np.busday_offset(a, k, roll="forward", holidays=company_holidays)),
+         timed(lambda: cal.offset(a, k, roll="forward"))),
+    ]
+    print(f"{n:,} date pairs (per-call loop timed on {loop_n:,})\n")
+    print(f"{'query':14s} {'loop ns/q':>10s} {'numpy vec ns/q':>15s} {'calendar ns/q':>14s} {'vs loop':>8s}")
+    for label, loop, vec, table in rows:
+        print(f"{label:14s} {loop * 1e9:10.0f} {vec * 1e9:15.1f} {table * 1e9:14.1f} {loop / table:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
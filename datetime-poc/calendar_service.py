@@ -0,0 +1,232 @@
+import numpy as np
+import time
+from collections import OrderedDict
+from datetime import date
+
+
+# Business-day calendar service with runtime holidays and cached month counts.
+#
+# Each month is summarised once as a cumulative business-day array (one entry
+# per day + 1) and kept in an LRU cache. Next to it sits one int per month:
+# business days from a fixed origin to that month's 1st (one vectorized
+# np.busday_count, extended when a query reaches past it). A range count is
+#   offset(last month) - offset(first month) - partial first + partial last
+# with both partials answered by a lookup in the cached cumulative arrays, so
+# count() does the same few int operations however many months it spans.
+# Adding a holiday drops the months it falls in and the month offsets.
+#
+# count_many() stitches the cached months covering the whole batch into one
+# day-level prefix array and answers every range with two vectorized lookups.
+# A batch spanning more than max_months builds that prefix without the cache,
+# so it cannot flush the LRU.
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class BusinessDayService:
+    def __init__(self, weekmask="1111100", holidays=(), max_months=1024):
+        self.weekmask = weekmask
+        self.max_months = max_months
+        self._holidays = np.unique(np.asarray(holidays, dtype="datetime64[D]"))
+        self._busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=self._holidays)
+        self._months = OrderedDict()  # month number -> cumulative counts
+        self._first = 0  # month number of self._offsets[0]
+        self._offsets = []  # business days from the 1st of self._first to each month's 1st
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def holidays(self):
+        return self._holidays
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "evictions": self.evictions, "invalidations": self.invalidations,
+                "cached_months": len(self._months)}
+
+    def add_holidays(self, dates):
+        dates = np.unique(np.asarray(dates, dtype="datetime64[D]").ravel())
+        new = np.setdiff1d(dates, self._holidays)
+        if not len(new):
+            return 0
+        self._holidays = np.union1d(self._holidays, new)
+        self._busdaycal = np.busdaycalendar(weekmask=self.weekmask, holidays=self._holidays)
+        self._offsets = []
+        for month in np.unique(new.astype("datetime64[M]").astype(np.int64)).tolist():
+            if self._months.pop(month, None) is not None:
+                self.invalidations += 1
+        return len(new)
+
+    def _month(self, month):
+        cum = self._months.get(month)
+        if cum is not None:
+            self.hits += 1
+            self._months.move_to_end(month)
+            return cum
+        self.misses += 1
+        start = np.datetime64(month, "M").astype("datetime64[D]")
+        end = (np.datetime64(month, "M") + 1).astype("datetime64[D]")
+        is_bd = np.is_busday(np.arange(start, end), busdaycal=self._busdaycal)
+        cum = [0] + np.cumsum(is_bd).tolist()
+        self._months[month] = cum
+        if len(self._months) > self.max_months:
+            self._months.popitem(last=False)
+            self.evictions += 1
+        return cum
+
+    def _between(self, bm, em):
+        # Business days from the 1st of month bm to the 1st of month em (bm <= em)
+        first, offsets = self._first, self._offsets
+        if bm < first or em >= first + len(offsets):
+            # Cover the old span and both months, with a year of slack either side
+            lo, hi = bm - 12, em + 13
+            if offsets:
+                lo, hi = min(lo, first), max(hi, first + len(offsets))
+            firsts = np.arange(lo, hi).astype("datetime64[M]").astype("datetime64[D]")
+            first = self._first = lo
+            offsets = self._offsets = np.busday_count(firsts[0], firsts, busdaycal=self._busdaycal).tolist()
+        return offsets[em - first] - offsets[bm - first]
+
+    def _prefix(self, day):
+        # (month, business days from the 1st of that month up to, not including, day)
+        d = date.fromordinal(day + _EPOCH_ORDINAL)
+        month = (d.year - 1970) * 12 + d.month - 1
+        return month, self._month(month)[d.day - 1]
+
+    def count(self, begindate, enddate):
+        b = _day_number(begindate)
+        e = _day_number(enddate)
+        # np.busday_count(b, e) with e < b is -count(e + 1, b + 1)
+        if e < b:
+            return -self._count(e + 1, b + 1)
+        return self._count(b, e)
+
+    def _count(self, b, e):
+        bm, bp = self._prefix(b)
+        em, ep = self._prefix(e)
+        if bm == em:
+            return ep - bp
+        return self._between(bm, em) - bp + ep
+
+    def count_many(self, begindates, enddates):
+        b = np.asarray(begindates, dtype="datetime64[D]")
+        e = np.asarray(enddates, dtype="datetime64[D]")
+        b, e = np.broadcast_arrays(b, e)
+        if b.size == 0:
+            return np.zeros(b.shape, dtype=np.int64)
+        backwards = e < b
+        lo = np.where(backwards, e + 1, b)
+        hi = np.where(backwards, b + 1, e)
+
+        # Day-level prefix over every month the batch touches, built from the cache
+        first = lo.min().astype("datetime64[M]")
+        last = hi.max().astype("datetime64[M]")
+        months = range(first.astype(np.int64).item(), last.astype(np.int64).item() + 1)
+        if len(months) > self.max_months:
+            # Through the cache this batch would evict every month it holds
+            days = np.arange(first.astype("datetime64[D]"), (last + 1).astype("datetime64[D]"))
+            cum = np.concatenate(([0], np.cumsum(np.is_busday(days, busdaycal=self._busdaycal))))
+        else:
+            pieces = [np.zeros(1, dtype=np.int64)]
+            running = 0
+            for month in months:
+                month_cum = self._month(month)
+                pieces.append(np.asarray(month_cum[1:], dtype=np.int64) + running)
+                running += month_cum[-1]
+            cum = np.concatenate(pieces)
+
+        origin = first.astype("datetime64[D]")
+        counts = cum[(hi - origin).astype(np.int64)] - cum[(lo - origin).astype(np.int64)]
+        return np.where(backwards, -counts, counts)
+
+
+def _day_number(value):
+    if isinstance(value, date):
+        return value.toordinal() - _EPOCH_ORDINAL
+    return np.datetime64(value, "D").astype(np.int64).item()
+
+
+def main():
+    print("=" * 40)
+    print("    Cached Business-day Calendar")
+    print("=" * 40, "\n")
+
+    # 1. Same project questions as main.py section 8
+
+    print("--- 1. Project timeline ---\n")
+
+    company_holidays = np.array(["2025-07-04", "2025-07-05"], dtype="datetime64[D]")
+    svc = BusinessDayService(holidays=company_holidays)
+    print("Effective business days:", svc.count("2025-06-02", "2025-08-29"),
+          "| np.busday_count:", np.busday_count("2025-06-02", "2025-08-29", holidays=company_holidays))
+    for month in np.arange("2025-06", "2025-09", dtype="datetime64[M]"):
+        ms = max(month.astype("datetime64[D]"), np.datetime64("2025-06-02"))
+        me = min((month + 1).astype("datetime64[D]"), np.datetime64("2025-08-29"))
+        print(f"  {month}: {svc.count(ms, me)}")
+    print("Cache:", svc.stats())
+    print()
+
+    # 2. Runtime holiday only invalidates its own month
+
+    print("--- 2. Adding a holiday ---\n")
+
+    svc.add_holidays(["2025-08-15"])
+    print("After adding 2025-08-15:", svc.stats())
+    print("Effective business days:", svc.count("2025-06-02", "2025-08-29"),
+          "| np.busday_count:", np.busday_count("2025-06-02", "2025-08-29", holidays=svc.holidays))
+    print()
+
+    # 3. Scheduler workload: many overlapping range queries
+
+    print("--- 3. Overlapping range queries ---\n")
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    base = np.datetime64("2024-01-01")
+    begins = base + rng.integers(0, 730, n).astype("timedelta64[D]")
+    ends = begins + rng.integers(-30, 400, n).astype("timedelta64[D]")
+
+    begins_list, ends_list = begins.tolist(), ends.tolist()  # datetime.date objects
+
+    svc = BusinessDayService(holidays=company_holidays, max_months=64)
+    start = time.perf_counter()
+    cached = svc.count_many(begins, ends)
+    svc_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    one_by_one = [svc.count(b, e) for b, e in zip(begins_list, ends_list)]
+    one_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_call = [np.busday_count(b, e, holidays=svc.holidays) for b, e in zip(begins, ends)]
+    loop_s = time.perf_counter() - start
+
+    print(f"{n:,} queries over 2 years")
+    print(f"  service.count_many:       {svc_s:.3f}s  ({svc_s / n * 1e6:.2f} us/query)")
+    print(f"  service.count per query:  {one_s:.3f}s  ({one_s / n * 1e6:.2f} us/query)")
+    print(f"  np.busday_count per call: {loop_s:.3f}s  ({loop_s / n * 1e6:.2f} us/query)")
+    print("  matches:", np.array_equal(cached, per_call) and one_by_one == per_call)
+    print("  cache:", {k: round(v, 4) if isinstance(v, float) else v for k, v in svc.stats().items()})
+
+    wide = svc.count_many(np.datetime64("1900-01-01"), np.datetime64("2100-01-01"))
+    print("  one 200-year range:", wide, "| np.busday_count:",
+          np.busday_count("1900-01-01", "2100-01-01", holidays=svc.holidays),
+          "| cached months kept:", len(svc._months))
+
+    # Holidays keep arriving; results stay in sync with a fresh np.busday_count
+    for day in ["2024-12-24", "2025-01-02", "2025-11-27"]:
+        svc.add_holidays([day])
+    same = np.array_equal(svc.count_many(begins[:5_000], ends[:5_000]),
+                          np.busday_count(begins[:5_000], ends[:5_000], holidays=svc.holidays))
+    print("  after 3 more holidays, matches:", same, "| invalidations:", svc.invalidations)
+
+
+if __name__ == "__main__":
+    main()
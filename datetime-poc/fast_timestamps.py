@@ -0,0 +1,286 @@
+import numpy as np
+import time
+import warnings
+
+
+# Bulk ISO-8601 timestamp parser.
+#
+# Input is a newline-separated bytes buffer or a fixed-width string array.
+# Each row is viewed as a row of uint8 codes, so every field (year, month,
+# ..., nanoseconds) is pulled out with whole-column arithmetic. Accepted forms
+# are the ones the section 6 demo mixes:
+#   YYYY-MM-DD[(T| )HH[:MM[:SS[.f{1,9}]]]][Z]
+# Rows that do not match, or hold an impossible date/time, come back as NaT
+# and are flagged in the returned invalid mask.
+#
+# NumPy's own string -> datetime64 cast is a single C pass and beats any
+# column-wise rewrite on clean input, but one bad row makes it raise for the
+# whole batch. So a batch whose rows all look like ISO dates is first handed
+# to that cast; only batches it rejects go through the vectorized parser.
+# The screen in front of the cast keeps both paths to the same grammar: a row
+# parses, or is invalid, no matter what else is in its batch. It reads the
+# raw code units (uint8 for bytes, uint32 for str), so str input reaches the
+# cast without an ASCII encode; only the vectorized parser needs one. The
+# screen is the price of the guarantee: on clean bytes input parse_iso takes
+# about 1.7x a bare .astype (it still skips that cast's raise on bad rows).
+#
+# Dates whose value does not fit an int64 in the unit (datetime64[ns] only
+# spans 1677-2262) are invalid: the vectorized parser checks the range, and
+# the fast path passes only years that fit, since NumPy's cast wraps silently.
+
+_WIDTH = 30  # "YYYY-MM-DDTHH:MM:SS.fffffffffZ"
+_NAT = np.iinfo(np.int64).min
+_UNIT_NS = {"s": 10**9, "ms": 10**6, "us": 10**3, "ns": 1}
+_DASH, _COLON, _DOT, _T, _SPACE, _Z = (ord(c) for c in "-:.T Z")
+
+
+def _as_strings(data):
+    # Contiguous 1-D S or U array
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = np.array(bytes(data).splitlines())
+    data = np.asarray(data)
+    if data.dtype.kind not in "SU":
+        raise TypeError(f"Expected bytes or a string array, got {data.dtype}")
+    return np.ascontiguousarray(data.ravel())
+
+
+def _to_codes(data):
+    # (n, _WIDTH) uint8 matrix, zero padded on the right
+    if data.dtype.kind == "U":
+        try:
+            data = data.astype("S")  # a C cast, far quicker than np.char.encode
+        except UnicodeEncodeError:
+            data = np.char.encode(data, "ascii", errors="replace")
+    width = data.dtype.itemsize
+    raw = data.view(np.uint8).reshape(len(data), width)
+    codes = np.zeros((len(data), max(width, _WIDTH)), dtype=np.uint8)
+    codes[:, :width] = raw
+    return codes
+
+
+def _days_from_civil(y, m, d):
+    # Howard Hinnant's days_from_civil, vectorized
+    y = y - (m <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400
+    doy = (153 * (m + np.where(m > 2, -3, 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _days_in_month(y, m):
+    leap = ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+    dim = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[np.clip(m, 0, 12)]
+    return dim + ((m == 2) & leap)
+
+
+# Value lengths the grammar allows: date, +hour, +minute, +second, +.f{1,9}
+_LENGTHS = np.zeros(_WIDTH + 1, dtype=bool)
+_LENGTHS[[10, 13, 16, 19, *range(21, 30)]] = True
+
+
+def _seconds_range(unit):
+    # Epoch seconds whose value in `unit` fits an int64 (and is not NaT)
+    factor = 10**9 // _UNIT_NS[unit]
+    lo = -((np.iinfo(np.int64).max) // factor)
+    hi = (np.iinfo(np.int64).max - (factor - 1)) // factor
+    return lo, hi
+
+
+def _numpy_cast(strings, unit):
+    # Screen out forms NumPy accepts but the grammar doesn't ("2025", "NaT",
+    # "today", 10+ fraction digits, a trailing "."), so a row is valid or not
+    # regardless of which path its batch takes. Among ISO-shaped strings NumPy
+    # accepts, those are exactly the ones with a length the grammar forbids;
+    # "Z" and offsets make NumPy warn and go to the vectorized parser anyway.
+    code = np.uint8 if strings.dtype.kind == "S" else np.uint32
+    width = strings.dtype.itemsize // np.dtype(code).itemsize
+    if width < 10:
+        return None
+    codes = strings.view(code).reshape(len(strings), width)
+    date_digits = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]] - code(48)
+    looks_iso = (codes[:, 4] == _DASH) & (codes[:, 7] == _DASH) & (date_digits < 10).all(axis=1)  # no "+025-..."
+    if not looks_iso.all():
+        return None
+    length = np.strings.str_len(strings)
+    if not _LENGTHS[np.minimum(length, _WIDTH)].all():
+        return None
+    lo, hi = _seconds_range(unit)
+    if hi < 10_000 * 366 * 86400:
+        # Years a full year clear of the int64 limits; rows near them take the exact check
+        d = date_digits.astype(np.int32)
+        years = ((d[:, 0] * 10 + d[:, 1]) * 10 + d[:, 2]) * 10 + d[:, 3]
+        span = hi // (366 * 86400) - 1
+        if not ((years > 1970 - span) & (years < 1970 + span)).all():
+            return None
+    with warnings.catch_warnings():
+        # Timezone suffixes only warn; treat them as a miss
+        warnings.simplefilter("error")
+        try:
+            return strings.astype(f"datetime64[{unit}]")
+        except (ValueError, UserWarning, DeprecationWarning):
+            return None
+
+
+def parse_iso(data, unit="s", fast_path=True):
+    if unit not in _UNIT_NS:
+        raise ValueError(f"unit must be one of {list(_UNIT_NS)}")
+    strings = _as_strings(data)
+    if fast_path:
+        values = _numpy_cast(strings, unit)
+        if values is not None:
+            return values, np.isnat(values)
+    return _parse_codes(_to_codes(strings), unit)
+
+
+def _parse_codes(codes, unit):
+    # One column per character position, each contiguous over all rows
+    cols = np.ascontiguousarray(codes.T)
+    n = cols.shape[1]
+    digits = cols - np.uint8(48)  # wraps for non-digits, so digits < 10 tests is-digit
+    is_digit = digits < 10
+
+    # Trailing whitespace / CR are not part of the value
+    length = np.zeros(n, dtype=np.int64)
+    for k, col in enumerate(cols):
+        length[(col != 0) & (col != _SPACE) & (col != 13) & (col != 9)] = k + 1
+    last = cols[np.maximum(length - 1, 0), np.arange(n)]
+    length -= (length > 0) & (last == _Z)
+
+    def num(lo, hi):
+        out = np.zeros(n, dtype=np.int64)
+        for k in range(lo, hi):
+            out *= 10
+            out += digits[k]
+        return out
+
+    def all_digits(lo, hi):
+        return np.logical_and.reduce(is_digit[lo:hi], axis=0)
+
+    ok = all_digits(0, 4) & (cols[4] == _DASH) & all_digits(5, 7) & (cols[7] == _DASH) & all_digits(8, 10)
+    has_h = length > 10
+    has_m = length > 13
+    has_s = length > 16
+    has_f = length > 19
+    ok &= (length == 10) | (has_h & ((cols[10] == _T) | (cols[10] == _SPACE)) & all_digits(11, 13))
+    ok &= ~has_h | (length == 13) | (has_m & (cols[13] == _COLON) & all_digits(14, 16))
+    ok &= ~has_m | (length == 16) | (has_s & (cols[16] == _COLON) & all_digits(17, 19))
+    ok &= ~has_s | (length == 19) | (has_f & (cols[19] == _DOT) & (length >= 21) & (length <= 29))
+
+    # Fraction: digits up to `length`, missing positions count as zero
+    nanos = np.zeros(n, dtype=np.int64)
+    for k in range(20, 29):
+        in_frac = k < length
+        ok &= ~in_frac | is_digit[k]
+        nanos *= 10
+        nanos += np.where(in_frac, digits[k], 0)
+
+    year, month, day = num(0, 4), num(5, 7), num(8, 10)
+    hour = np.where(has_h, num(11, 13), 0)
+    minute = np.where(has_m, num(14, 16), 0)
+    second = np.where(has_s, num(17, 19), 0)
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= _days_in_month(year, month))
+    ok &= (hour < 24) & (minute < 60) & (second < 60)
+
+    seconds = _days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    lo, hi = _seconds_range(unit)
+    ok &= (seconds >= lo) & (seconds <= hi)
+    scale = _UNIT_NS[unit]
+    # Sub-unit fractions are truncated (floor) when the unit is coarser than ns
+    values = seconds * (10**9 // scale) + nanos // scale
+    invalid = ~ok
+    values[invalid] = _NAT
+    return values.view(f"datetime64[{unit}]"), invalid
+
+
+def main():
+    print("=" * 40)
+    print("     Bulk ISO Timestamp Parsing")
+    print("=" * 40, "\n")
+
+    # 1. Mixed precision from main.py section 6
+
+    print("--- 1. Mixed precision ---\n")
+
+    strings = ["2025-01-15", "2025-06-30T12:00", "2025-12-25T08:30:00"]
+    parsed, bad = parse_iso(np.array(strings), unit="s")
+    expected = np.array(strings, dtype="datetime64[s]")
+    print("Parsed:  ", parsed)
+    print("Matches constructor:", np.array_equal(parsed, expected))
+
+    buffer = b"2025-06-15T14:30:45.5Z\n2025-02-29\n2024-02-29 23:59:59.123456789\nnot a date\n2025-06-15T14\n"
+    parsed, bad = parse_iso(buffer, unit="ns")
+    print("\nFrom bytes buffer [ns]:")
+    for value, b in zip(parsed, bad):
+        print(f"  {value}  invalid={b}")
+
+    # A row is valid or not on its own, whichever path its batch takes
+    edge = ["2025-06-15T14:30:45.1234567891", "2025-06-15T14:30:45."]
+    print("\n10 fraction digits / trailing dot, with a valid row:",
+          parse_iso(np.array(edge + ["2025-01-01"]))[1][:2],
+          "| with a corrupt row:", parse_iso(np.array(edge + ["corrupt"]))[1][:2])
+    out_of_range = np.array(["2300-01-01", "1677-09-21T00:12:44", "1677-09-21T00:12:43"])
+    print("Outside datetime64[ns] (fast path / vectorized):", parse_iso(out_of_range, "ns")[1],
+          parse_iso(np.append(out_of_range, "bad"), "ns")[1][:3])
+    print()
+
+    # 2. Benchmark against the constructor path
+
+    print("--- 2. Benchmark ---\n")
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    secs = rng.integers(0, 20 * 365 * 86400, n).astype("timedelta64[s]")
+    stamps = (np.datetime64("2010-01-01T00:00:00") + secs).astype(str)
+    stamps[::3] = np.char.add(stamps[::3], ".250")
+    as_list = stamps.tolist()
+    as_bytes = np.char.encode(stamps, "ascii")
+    buffer = b"\n".join(as_bytes.tolist())
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - start, result
+
+    ref_s, ref = timed(lambda: np.array(as_list, dtype="datetime64[ns]"))
+    cases = [
+        ("np.array(list, dtype=M8[ns])", ref_s, ref),
+        ("S array .astype(M8[ns])", *timed(lambda: as_bytes.astype("datetime64[ns]"))),
+        ("U array .astype(M8[ns])", *timed(lambda: stamps.astype("datetime64[ns]"))),
+        ("parse_iso(S array)", *timed(lambda: parse_iso(as_bytes, "ns")[0])),
+        ("parse_iso(U array)", *timed(lambda: parse_iso(stamps, "ns")[0])),
+        ("parse_iso(bytes buffer)", *timed(lambda: parse_iso(buffer, "ns")[0])),
+        ("vectorized path only", *timed(lambda: parse_iso(as_bytes, "ns", fast_path=False)[0])),
+    ]
+    print(f"{n:,} clean timestamps\n")
+    for label, seconds, result in cases:
+        print(f"{label:30s} {seconds:6.3f}s  {n / seconds / 1e6:6.2f} M/s  match={np.array_equal(result, ref)}")
+
+    # One corrupt row makes the constructor raise for the whole batch, so the
+    # constructor path needs a per-row fallback to recover the good rows
+    dirty = stamps.copy()
+    dirty[::1000] = "corrupt"
+
+    def constructor_with_fallback():
+        try:
+            return np.array(dirty.tolist(), dtype="datetime64[ns]")
+        except ValueError:
+            out = np.empty(n, dtype="datetime64[ns]")
+            for i, text in enumerate(dirty.tolist()):
+                try:
+                    out[i] = np.datetime64(text, "ns")
+                except ValueError:
+                    out[i] = np.datetime64("NaT")
+            return out
+
+    slow_s, slow = timed(constructor_with_fallback)
+    dirty_bytes = np.char.encode(dirty, "ascii")
+    fast_s, (fast, bad) = timed(lambda: parse_iso(dirty_bytes, "ns"))
+    print(f"\n{n:,} timestamps, {int(bad.sum()):,} corrupt\n")
+    print(f"{'constructor + per-row fallback':30s} {slow_s:6.3f}s  {n / slow_s / 1e6:6.2f} M/s")
+    print(f"{'parse_iso':30s} {fast_s:6.3f}s  {n / fast_s / 1e6:6.2f} M/s  "
+          f"match={np.array_equal(fast, slow, equal_nan=True)}")
+
+
+if __name__ == "__main__":
+    main()
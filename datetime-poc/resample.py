@@ -0,0 +1,288 @@
+import numpy as np
+import time
+
+from fast_timestamps import parse_iso
+
+
+# Time-bucket resampling and rolling windows on datetime64 arrays, no pandas.
+#
+# resample() floors every timestamp to its bucket (h/D/W/M/Y via a datetime64
+# cast, B via np.busday_offset). Sorted input finds bucket boundaries with
+# searchsorted and reduces each run with ufunc.reduceat; unsorted input is
+# scattered by bucket id with np.bincount / ufunc.at, so it is never sorted.
+# Empty buckets come back as count 0 / sum 0 / NaN. NaT timestamps are
+# dropped before bucketing.
+#
+# Weeks follow NumPy's datetime64[W] epoch, so "W" buckets start on Thursday,
+# matching the np.arange(..., dtype="datetime64[W]") grid in main.py.
+
+FREQS = ("h", "D", "W", "M", "Y", "B")
+AGGS = ("count", "sum", "mean", "min", "max")
+
+
+def floor_to(ts, freq, busdaycal=None):
+    ts = np.asarray(ts)
+    if freq == "B":
+        cal = busdaycal if busdaycal is not None else np.busdaycalendar()
+        # Weekend/holiday events count towards the previous business day
+        return np.busday_offset(ts.astype("datetime64[D]"), 0, roll="backward", busdaycal=cal)
+    if freq not in FREQS:
+        raise ValueError(f"freq must be one of {FREQS}, got {freq!r}")
+    return ts.astype(f"datetime64[{freq}]")
+
+
+def bucket_grid(first, last, freq, busdaycal=None):
+    if freq == "B":
+        cal = busdaycal if busdaycal is not None else np.busdaycalendar()
+        days = np.arange(first, last + np.timedelta64(1, "D"), dtype="datetime64[D]")
+        return days[np.is_busday(days, busdaycal=cal)]
+    return np.arange(first, last + np.timedelta64(1, freq), dtype=f"datetime64[{freq}]")
+
+
+def _empty_result(grid, aggs):
+    return grid, {agg: np.zeros(0, dtype=np.int64 if agg == "count" else np.float64) for agg in aggs}
+
+
+def resample(ts, values, freq, aggs=AGGS, start=None, end=None, busdaycal=None):
+    ts = np.asarray(ts)
+    values = np.asarray(values)
+    if ts.shape != values.shape or ts.ndim != 1:
+        raise ValueError(f"ts and values must be 1-D and the same shape, got {ts.shape} and {values.shape}")
+    for agg in aggs:
+        if agg not in AGGS:
+            raise ValueError(f"Unknown aggregation {agg!r}; expected one of {AGGS}")
+
+    # NaT rows (e.g. invalid rows from fast_timestamps.parse_iso) belong to no bucket
+    if ts.dtype.kind == "M":
+        known = ~np.isnat(ts)
+        if not known.all():
+            ts, values = ts[known], values[known]
+
+    keys = floor_to(ts, freq, busdaycal)
+    if len(keys) == 0 and (start is None or end is None):
+        return _empty_result(keys[:0], aggs)
+    first = floor_to(np.asarray(start, dtype=ts.dtype), freq, busdaycal) if start is not None else keys.min()
+    last = floor_to(np.asarray(end, dtype=ts.dtype), freq, busdaycal) if end is not None else keys.max()
+    grid = bucket_grid(first, last, freq, busdaycal)
+    if len(grid) == 0:
+        return _empty_result(grid, aggs)
+
+    if (keys[1:] >= keys[:-1]).all():
+        return grid, _reduce_sorted(grid, keys, values, aggs)
+    return grid, _reduce_unsorted(grid, keys, values, aggs, freq)
+
+
+def _reduce_sorted(grid, keys, values, aggs):
+    # Drop events outside [start, end] so every remaining one lands in the grid
+    lo = np.searchsorted(keys, grid[0], side="left")
+    hi = np.searchsorted(keys, grid[-1], side="right")
+    keys, values = keys[lo:hi], values[lo:hi]
+
+    bounds = np.searchsorted(keys, grid, side="left")
+    counts = np.diff(np.append(bounds, len(keys)))
+    nonempty = counts > 0
+    # Only non-empty runs go to reduceat: it returns values[i] for empty ones
+    starts = bounds[nonempty]
+
+    out = {}
+    for agg in aggs:
+        if agg == "count":
+            out[agg] = counts
+            continue
+        result = np.full(len(grid), 0.0 if agg == "sum" else np.nan)
+        if len(starts):
+            if agg in ("sum", "mean"):
+                sums = np.add.reduceat(values, starts, dtype=np.float64)
+                result[nonempty] = sums if agg == "sum" else sums / counts[nonempty]
+            elif agg == "min":
+                result[nonempty] = np.minimum.reduceat(values, starts)
+            else:
+                result[nonempty] = np.maximum.reduceat(values, starts)
+        out[agg] = result
+    return out
+
+
+def _reduce_unsorted(grid, keys, values, aggs, freq):
+    # Unsorted input: scatter into buckets by id instead of paying for a sort
+    if freq == "B":
+        ids = np.searchsorted(grid, keys)
+        inside = (ids < len(grid)) & (grid[np.minimum(ids, len(grid) - 1)] == keys)
+    else:
+        ids = (keys - grid[0]).astype(np.int64)
+        inside = (ids >= 0) & (ids < len(grid))
+    if not inside.all():
+        ids, values = ids[inside], values[inside]
+
+    counts = np.bincount(ids, minlength=len(grid))
+    empty = counts == 0
+    out = {}
+    for agg in aggs:
+        if agg == "count":
+            out[agg] = counts
+        elif agg in ("sum", "mean"):
+            sums = np.bincount(ids, weights=values, minlength=len(grid))
+            if agg == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    sums = sums / counts
+            out[agg] = sums
+        else:
+            ufunc = np.minimum if agg == "min" else np.maximum
+            result = np.full(len(grid), np.inf if agg == "min" else -np.inf)
+            ufunc.at(result, ids, values)
+            result[empty] = np.nan
+            out[agg] = result
+    return out
+
+
+def rolling_time(ts, values, window, aggs=("count", "sum", "mean")):
+    # Trailing window (t - window, t] at every event of a sorted stream.
+    # Prefix sums make each window O(1), so the whole pass is O(n) after the
+    # vectorized searchsorted for the left edges. NaN values follow rolling():
+    # a window holding one sums to NaN. NaT events belong to no window, as in
+    # resample(), and get count 0 / sum 0 / mean NaN.
+    ts = np.asarray(ts)
+    values = np.asarray(values, dtype=np.float64)
+    known = ~np.isnat(ts) if ts.dtype.kind == "M" else np.ones(len(ts), dtype=bool)
+    t, v = ts[known], values[known]
+    left = np.searchsorted(t, t - window, side="right")
+    right = np.arange(1, len(t) + 1)
+    nan = np.isnan(v)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, v))))
+    nans = np.concatenate(([0], np.cumsum(nan)))
+    count = np.zeros(len(ts), dtype=np.int64)
+    total = np.zeros(len(ts))
+    count[known] = right - left
+    total[known] = np.where(nans[right] > nans[left], np.nan, csum[right] - csum[left])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = {"count": count, "sum": total, "mean": total / count}
+    return {agg: out[agg] for agg in aggs}
+
+
+def rolling(x, window, agg="mean"):
+    # Fixed-length trailing window over a regular series (e.g. resample output),
+    # O(n) for every aggregation. Min/max use the van Herk/Gil-Werman split:
+    # block-wise prefix and suffix extrema, one of each per output.
+    # NaN policy, the same for every aggregation: a window holding a NaN (an
+    # empty resample bucket) is NaN, as np.sum/np.min over it would be.
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if window < 1 or window > n:
+        raise ValueError(f"window must be in [1, {n}], got {window}")
+    if agg in ("sum", "mean"):
+        # NaNs are counted separately so one does not poison every later prefix sum
+        nan = np.isnan(x)
+        csum = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, x))))
+        nans = np.concatenate(([0], np.cumsum(nan)))
+        total = csum[window:] - csum[:-window]
+        total[nans[window:] > nans[:-window]] = np.nan
+        return total if agg == "sum" else total / window
+    if agg not in ("min", "max"):
+        raise ValueError(f"Unknown aggregation {agg!r}")
+
+    ufunc = np.minimum if agg == "min" else np.maximum
+    pad = -n % window
+    neutral = np.inf if agg == "min" else -np.inf
+    padded = np.concatenate((x, np.full(pad, neutral))).reshape(-1, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[: n - window + 1], prefix[window - 1: n])
+
+
+def main():
+    print("=" * 40)
+    print("   Time-bucket Resampling & Rolling")
+    print("=" * 40, "\n")
+
+    rng = np.random.default_rng(0)
+
+    # 1. Bucket an event stream into the section 4 grids
+
+    print("--- 1. Buckets ---\n")
+
+    events = np.datetime64("2025-06-15T09:00") + rng.integers(0, 8 * 60, 40).astype("timedelta64[m]")
+    readings = rng.normal(20, 2, size=40).round(1)
+    grid, stats = resample(events, readings, "h")
+    print("Hourly grid:", grid)
+    for agg, vals in stats.items():
+        print(f"  {agg:5s}: {np.round(vals, 2)}")
+
+    events = np.datetime64("2025-06-01") + rng.integers(0, 92 * 24, 500).astype("timedelta64[h]")
+    for freq in ["D", "W", "M", "B"]:
+        grid, stats = resample(events, np.ones(len(events)), freq)
+        print(f"{freq}: {len(grid)} buckets, first {grid[0]}, count[:5] = {stats['count'][:5]}")
+
+    holidays = np.array(["2025-07-04"], dtype="datetime64[D]")
+    grid, stats = resample(events, np.ones(len(events)), "B", busdaycal=np.busdaycalendar(holidays=holidays),
+                           start="2025-07-01", end="2025-07-09")
+    print("Business days around 2025-07-04:", dict(zip(grid.astype(str).tolist(), stats["count"].tolist())))
+
+    # Invalid rows from the bulk parser come back as NaT and are skipped
+    parsed, invalid = parse_iso(np.array(["2025-06-15T09:10", "garbage", "2025-06-15T11:45", "2025-06-15T09:55"]))
+    grid, stats = resample(parsed, np.array([1.0, 2.0, 3.0, 4.0]), "h")
+    print("parse_iso with", int(invalid.sum()), "invalid row ->", dict(zip(grid.astype(str).tolist(), stats["sum"].tolist())))
+    print()
+
+    # 2. Rolling windows
+
+    print("--- 2. Rolling ---\n")
+
+    series = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+    print("Series:", series)
+    for agg in ["sum", "mean", "min", "max"]:
+        print(f"  rolling(3, {agg!r}):", rolling(series, 3, agg))
+
+    ts = np.array(["2025-06-15T09:00", "2025-06-15T09:20", "2025-06-15T09:50", "2025-06-15T10:10"],
+                  dtype="datetime64[m]")
+    out = rolling_time(ts, [1.0, 2.0, 3.0, 4.0], np.timedelta64(30, "m"))
+    print("Trailing 30 min window count/sum:", out["count"], out["sum"])
+    out = rolling_time(ts, [1.0, np.nan, 3.0, 4.0], np.timedelta64(30, "m"))
+    print("  with a NaN reading:", out["sum"])
+    gappy = np.array([3.0, np.nan, 4.0, 1.0, 5.0, 9.0])
+    print("With an empty bucket:", gappy)
+    for agg in ["sum", "min"]:
+        print(f"  rolling(2, {agg!r}):", rolling(gappy, 2, agg))
+    print()
+
+    # 3. Benchmark
+
+    print("--- 3. Benchmark ---\n")
+
+    n = 10_000_000
+    ts = np.datetime64("2025-01-01T00:00:00") + rng.integers(0, 365 * 86400, n).astype("timedelta64[s]")
+    vals = rng.random(n)
+
+    start = time.perf_counter()
+    grid, stats = resample(ts, vals, "h")
+    unsorted_s = time.perf_counter() - start
+    ts_sorted = np.sort(ts)
+    start = time.perf_counter()
+    resample(ts_sorted, vals, "h")
+    sorted_s = time.perf_counter() - start
+    print(f"{n:,} events -> {len(grid):,} hourly buckets")
+    print(f"  unsorted input: {unsorted_s:.2f}s ({n / unsorted_s / 1e6:.1f} M events/s)")
+    print(f"  sorted input:   {sorted_s:.2f}s ({n / sorted_s / 1e6:.1f} M events/s)")
+
+    # Reference: bincount on bucket ids (sum/count only)
+    ids = (ts.astype("datetime64[h]") - grid[0]).astype(np.int64)
+    print("  sum matches bincount:", np.allclose(np.bincount(ids, vals, minlength=len(grid)), stats["sum"]))
+
+    month_n = 200_000
+    start = time.perf_counter()
+    for month in np.arange("2025-01", "2026-01", dtype="datetime64[M]"):
+        sel = (ts[:month_n] >= month) & (ts[:month_n] < month + 1)
+        vals[:month_n][sel].sum()
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    resample(ts[:month_n], vals[:month_n], "M")
+    vec_s = time.perf_counter() - start
+    print(f"\nMonthly on {month_n:,} events: per-bucket mask loop {loop_s * 1e3:.1f} ms, resample {vec_s * 1e3:.1f} ms")
+
+    x = rng.random(5_000_000)
+    for agg in ["mean", "max"]:
+        start = time.perf_counter()
+        rolling(x, 1_000, agg)
+        print(f"rolling(window=1000, {agg!r}) on {len(x):,}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import numpy as np
+import tempfile
+import os
+import shutil
+import json
+import struct
+import time
+import zlib
+import lzma
+import bz2
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Block-compressed alternative to np.savez_compressed.
+#
+# Each array is split into row blocks that are compressed independently on a
+# thread pool (zlib, lzma and bz2 all release the GIL while working on a
+# buffer). The index stores every block's offset and length, so a row range
+# can be read back by inflating only the blocks it overlaps. A reader keeps
+# one thread pool for all its reads (or uses the executor it is given), so
+# many small range reads do not each pay for starting threads.
+#
+# Layout:
+#   [magic 8B][index offset u64][index length u64]
+#   [block][block]...   [JSON index]
+
+MAGIC = b"NPBLK\x00\x01\x00"
+_HEADER = struct.Struct("<8sQQ")
+
+CODECS = {
+    "zlib": (lambda buf, level: zlib.compress(buf, level), zlib.decompress, 6),
+    "lzma": (lambda buf, level: lzma.compress(buf, preset=level), lzma.decompress, 1),
+    "bz2": (lambda buf, level: bz2.compress(buf, level), bz2.decompress, 9),
+    "none": (lambda buf, level: bytes(buf), bytes, 0),
+}
+
+
+def _block_rows(arr, block_bytes):
+    row_bytes = max(1, arr.nbytes // max(1, len(arr)))
+    return max(1, block_bytes // row_bytes)
+
+
+def save(path, codec="zlib", level=None, block_bytes=1 << 20, workers=None, **arrays):
+    compress, _, default_level = CODECS[codec]
+    level = default_level if level is None else level
+    index = {}
+
+    with open(path, "wb") as f, ThreadPoolExecutor(workers) as pool:
+        f.write(b"\x00" * _HEADER.size)
+        for name, arr in arrays.items():
+            shape = list(np.shape(arr))
+            # ascontiguousarray also turns 0-d scalars into 1 row
+            arr = np.ascontiguousarray(arr)
+            rows = _block_rows(arr, block_bytes)
+            step = rows * (arr.nbytes // max(1, len(arr)))
+            # Slices of a uint8 view avoid copying each block before compressing
+            flat = memoryview(arr.reshape(-1).view(np.uint8))
+            blocks = [flat[s:s + step] for s in range(0, arr.nbytes, step)] if step else []
+
+            entries = []
+            for blob in pool.map(lambda b: compress(b, level), blocks):
+                entries.append([f.tell(), len(blob)])
+                f.write(blob)
+            # The .npy header's descr: keeps byte order and structured field names
+            index[name] = {"dtype": np.lib.format.dtype_to_descr(arr.dtype), "shape": shape, "codec": codec,
+                           "block_rows": rows, "blocks": entries}
+
+        blob = json.dumps(index).encode()
+        index_offset = f.tell()
+        f.write(blob)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, index_offset, len(blob)))
+
+
+class BlockCompressedFile:
+    def __init__(self, path, workers=None, executor=None):
+        self.path = path
+        self.workers = workers
+        self._pool = executor
+        self._owns_pool = executor is None
+        with open(path, "rb") as f:
+            magic, index_offset, index_length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a block-compressed file (magic={magic!r})")
+            f.seek(index_offset)
+            self.index = json.loads(f.read(index_length))
+
+    def keys(self):
+        return list(self.index)
+
+    def __getitem__(self, name):
+        return self.read(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        # Shuts down the reader's own pool; an executor passed in is left running
+        if self._owns_pool and self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def shape(self, name):
+        return tuple(self.index[name]["shape"])
+
+    def read(self, name, start=None, stop=None):
+        entry = self.index[name]
+        dtype = np.lib.format.descr_to_dtype(entry["dtype"])
+        shape = tuple(entry["shape"]) or (1,)
+        n = shape[0]
+        start, stop, _ = slice(start, stop).indices(n)
+        stop = max(start, stop)
+        rows = entry["block_rows"]
+        _, decompress, _ = CODECS[entry["codec"]]
+
+        out = np.empty((stop - start,) + shape[1:], dtype=dtype)
+        if stop == start:
+            return out
+        first, last = start // rows, (stop - 1) // rows
+        blocks = entry["blocks"][first:last + 1]
+
+        with open(self.path, "rb") as f:
+            raws = []
+            for offset, length in blocks:
+                f.seek(offset)
+                raws.append(f.read(length))
+
+        def inflate(i):
+            block_start = (first + i) * rows
+            block = np.frombuffer(decompress(raws[i]), dtype=dtype).reshape((-1,) + shape[1:])
+            lo, hi = max(start, block_start), min(stop, block_start + len(block))
+            out[lo - start:hi - start] = block[lo - block_start:hi - block_start]
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers)
+        list(self._pool.map(inflate, range(len(blocks))))
+        if not entry["shape"]:
+            return out.reshape(())
+        return out
+
+
+def load(path, workers=None, executor=None):
+    return BlockCompressedFile(path, workers, executor)
+
+
+def main():
+    print("=" * 40)
+    print("     Block-compressed Array Store")
+    print("=" * 40, "\n")
+
+    tmpdir = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+
+    # 1. Round trip and row-range reads
+
+    print("--- 1. Round trip + row ranges ---\n")
+
+    x = np.random.rand(100, 50)
+    y = np.random.randint(0, 10, size=100)
+    path = os.path.join(tmpdir, "arrays.npb")
+    save(path, block_bytes=4096, features=x, labels=y)
+
+    with load(path) as data:
+        print("Keys:", data.keys())
+        entry = data.index["features"]
+        print(f"features: {len(entry['blocks'])} blocks of {entry['block_rows']} rows")
+        print("Match:", np.array_equal(data["features"], x) and np.array_equal(data["labels"], y))
+        print("Rows 30:45 match:", np.array_equal(data.read("features", 30, 45), x[30:45]))
+
+    points = np.zeros(4, dtype=[("id", "<u4"), ("xy", ">f8", (2,))])
+    points["id"], points["xy"] = np.arange(4), np.arange(8).reshape(4, 2)
+    save(path, points=points)
+    with load(path) as data:
+        print("Structured dtype kept:", data["points"].dtype, "| match:", np.array_equal(data["points"], points))
+    print()
+
+    # 2. Compression ratio vs throughput
+
+    print("--- 2. Ratio vs throughput ---\n")
+
+    # Sensor-like data: rounded readings and small integer labels compress well
+    features = np.round(rng.normal(20, 5, size=(500_000, 8)), 2)
+    labels = rng.integers(0, 10, size=500_000)
+    raw_mb = (features.nbytes + labels.nbytes) / 1e6
+    print(f"Raw size: {raw_mb:.0f} MB\n")
+    print(f"{'format':22s} {'ratio':>7s} {'save MB/s':>10s} {'load MB/s':>10s} {'rows 1000:1100':>15s}")
+
+    def report(label, path, save_fn, load_fn, range_fn):
+        start = time.perf_counter()
+        save_fn()
+        save_s = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = load_fn()
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        part = range_fn()
+        range_ms = (time.perf_counter() - start) * 1e3
+        assert np.array_equal(loaded, features) and np.array_equal(part, features[1000:1100])
+        ratio = os.path.getsize(path) / 1e6 / raw_mb * 100
+        print(f"{label:22s} {ratio:6.1f}% {raw_mb / save_s:10.0f} {raw_mb / load_s:10.0f} {range_ms:12.2f} ms")
+
+    npz_path = os.path.join(tmpdir, "arrays_compressed.npz")
+
+    def npz_load():
+        with np.load(npz_path) as d:
+            d["labels"]
+            return d["features"]
+
+    def npz_range():
+        with np.load(npz_path) as d:
+            return d["features"][1000:1100]
+
+    report("np.savez_compressed", npz_path,
+           lambda: np.savez_compressed(npz_path, features=features, labels=labels),
+           npz_load, npz_range)
+
+    for codec, level in [("zlib", 1), ("zlib", 6), ("lzma", 1), ("bz2", 9)]:
+        path = os.path.join(tmpdir, f"arrays_{codec}{level}.npb")
+
+        def block_load():
+            with load(path) as d:
+                d["labels"]
+                return d["features"]
+
+        def block_range():
+            with load(path) as d:
+                return d.read("features", 1000, 1100)
+
+        report(f"blocks {codec}-{level}", path,
+               lambda: save(path, codec=codec, level=level, features=features, labels=labels),
+               block_load, block_range)
+
+    print(f"\nThreads: {os.cpu_count()} (ThreadPoolExecutor default: {min(32, os.cpu_count() + 4)})")
+
+    shutil.rmtree(tmpdir)
+    print("\nCleaned up temp directory.")
+
+
+if __name__ == "__main__":
+    main()
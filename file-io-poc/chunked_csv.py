@@ -0,0 +1,233 @@
+import numpy as np
+import tempfile
+import os
+import shutil
+import time
+from itertools import islice
+from numpy.lib.recfunctions import structured_to_unstructured
+
+
+# Streaming CSV reader: yields fixed-size row blocks as structured arrays.
+# Fields of a block are split in one go and parsed by casting a bytes array
+# (dtype "S") to the target dtype, so the per-value work runs in C instead of
+# the per-row Python loop behind np.genfromtxt.
+#
+# As in np.loadtxt/np.genfromtxt, text after the comments marker ("#" by
+# default, None to disable) is dropped, and so are lines left blank by that.
+# Empty or whitespace-only fields are missing and take the column's fill value.
+# Fields are not quoted, so a field cannot contain the delimiter.
+#
+# The yielded block is a view into a buffer that is reused for every block;
+# copy it if it has to outlive the next iteration.
+
+class ChunkedCSVReader:
+    def __init__(self, path, block_rows=65_536, delimiter=",", skip_header=0,
+                 names=None, usecols=None, dtypes=np.float64, fill_values=np.nan, comments="#"):
+        self.path = path
+        self.block_rows = block_rows
+        self.delimiter = delimiter.encode()
+        self.skip_header = skip_header
+        self.comments = comments.encode() if comments else None
+
+        with open(path, "rb") as f:
+            for _ in range(skip_header):
+                header = f.readline()
+            first = b""
+            for line in f:
+                kept = self._lines([line], 1)
+                if kept:
+                    first = kept[0]
+                    break
+        self.ncols = len(first.split(self.delimiter))
+
+        if names is None and skip_header:
+            names = [n.strip() for n in header.decode().rstrip("\r\n").split(delimiter)]
+        if names is None:
+            names = [f"f{i}" for i in range(self.ncols)]
+        if len(names) != self.ncols:
+            raise ValueError(f"Got {len(names)} names for {self.ncols} columns")
+
+        if usecols is None:
+            usecols = range(self.ncols)
+        self.usecols = [names.index(c) if isinstance(c, str) else c for c in usecols]
+        self.names = [names[c] for c in self.usecols]
+
+        # Scalars apply to every selected column, lists/dicts are per column
+        self.dtypes = self._per_column(dtypes)
+        self.fill_values = self._per_column(fill_values)
+
+        self.dtype = np.dtype([(n, np.dtype(dt)) for n, dt in zip(self.names, self.dtypes)])
+        for name, fill in zip(self.names, self.fill_values):
+            if self.dtype[name].kind in "iub" and isinstance(fill, float) and np.isnan(fill):
+                raise ValueError(f"Column {name!r} is integer; pass a non-NaN fill value")
+
+        self._buffer = np.empty(block_rows, dtype=self.dtype)
+
+    def _per_column(self, value):
+        if isinstance(value, dict):
+            return [value[n] for n in self.names]
+        if isinstance(value, (list, tuple)):
+            if len(value) != len(self.names):
+                raise ValueError(f"Expected {len(self.names)} values, got {len(value)}")
+            return list(value)
+        return [value] * len(self.names)
+
+    def _lines(self, f, count):
+        # Up to `count` raw lines, comments cut off, blank ones dropped
+        lines = islice(f, count)
+        c = self.comments
+        if c is not None:
+            lines = (line.split(c, 1)[0] if c in line else line for line in lines)
+        return [line.rstrip(b"\r\n") for line in lines if line.strip()]
+
+    def _parse(self, lines):
+        n = len(lines)
+        # Joined and split on the real delimiter, so other characters stay inside their field
+        raw = np.array(self.delimiter.join(lines).split(self.delimiter))
+        if raw.size != n * self.ncols:
+            raise ValueError(f"Ragged rows in block: expected {self.ncols} fields per row")
+        raw = raw.reshape(n, self.ncols)
+
+        out = self._buffer[:n]
+        for name, col, fill in zip(self.names, self.usecols, self.fill_values):
+            values = raw[:, col]
+            missing = np.strings.strip(values) == b""
+            if missing.any():
+                values = np.where(missing, b"0", values)
+                out[name] = values
+                out[name][missing] = fill
+            else:
+                out[name] = values
+        return out
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for _ in range(self.skip_header):
+                f.readline()
+            while True:
+                raw_pos = f.tell()
+                lines = self._lines(f, self.block_rows)
+                if not lines:
+                    if f.tell() == raw_pos:
+                        break
+                    continue  # a block of nothing but comments and blank lines
+                yield self._parse(lines)
+
+    def read(self):
+        # Convenience: concatenate every block (copies out of the reused buffer)
+        blocks = [block.copy() for block in self]
+        if not blocks:
+            return np.empty(0, dtype=self.dtype)
+        return np.concatenate(blocks)
+
+
+def to_2d(block):
+    # Homogeneous structured block -> plain (rows, cols) array
+    return structured_to_unstructured(block)
+
+
+# Benchmark vs np.loadtxt / np.genfromtxt
+
+def _write_csv(path, rows, cols, missing_rate, rng):
+    table = np.round(rng.random((rows, cols)) * 1000, 3)
+    text = table.astype("U")
+    text[rng.random((rows, cols)) < missing_rate] = ""
+    with open(path, "w") as f:
+        f.write(",".join(f"c{i}" for i in range(cols)) + "\n")
+        for row in text:
+            f.write(",".join(row) + "\n")
+    return table
+
+
+def _best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print("=" * 40)
+    print("      Chunked CSV Ingestion")
+    print("=" * 40, "\n")
+
+    tmpdir = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+
+    # 1. Missing fields become NaN, like the genfromtxt demo
+
+    print("--- 1. Missing values ---\n")
+
+    messy_path = os.path.join(tmpdir, "messy.csv")
+    with open(messy_path, "w") as f:
+        f.write("a,b,c\n85,90,78\n,88,92\n91,,85\n76,82,\n")
+
+    reader = ChunkedCSVReader(messy_path, block_rows=2, skip_header=1)
+    for i, block in enumerate(reader):
+        print(f"Block {i}: {block}")
+    expected = np.genfromtxt(messy_path, delimiter=",", skip_header=1)
+    print("Matches genfromtxt:", np.array_equal(to_2d(reader.read()), expected, equal_nan=True))
+
+    semi_path = os.path.join(tmpdir, "semicolon.csv")
+    with open(semi_path, "w") as f:
+        f.write("# exported 2025-06-15\nid;price;note\n1;2.5;a,b\n2; ;c\n# trailer\n3;4.0;d  # checked\n")
+    reader = ChunkedCSVReader(semi_path, delimiter=";", skip_header=2, usecols=["id", "price"])
+    expected = np.genfromtxt(semi_path, delimiter=";", skip_header=2, usecols=(0, 1))
+    print("';'-delimited, comma inside a field, blank field, comments:",
+          reader.read(), "| genfromtxt match:", np.array_equal(to_2d(reader.read()), expected, equal_nan=True))
+    print()
+
+    # 2. Column subset with per-column dtype and fill value
+
+    print("--- 2. Column subset + dtypes ---\n")
+
+    reader = ChunkedCSVReader(messy_path, skip_header=1, usecols=["c", "a"],
+                              dtypes={"c": np.float32, "a": np.int32},
+                              fill_values={"c": np.nan, "a": -1})
+    table = reader.read()
+    print("dtype:", table.dtype)
+    print("Rows:", table)
+    print()
+
+    # 3. Throughput
+
+    print("--- 3. Throughput ---\n")
+
+    rows, cols = 200_000, 8
+    clean_path = os.path.join(tmpdir, "clean.csv")
+    holes_path = os.path.join(tmpdir, "holes.csv")
+    _write_csv(clean_path, rows, cols, 0.0, rng)
+    _write_csv(holes_path, rows, cols, 0.05, rng)
+    size_mb = os.path.getsize(holes_path) / 1e6
+    print(f"{rows:,} rows x {cols} cols, {size_mb:.1f} MB\n")
+
+    def chunked(path):
+        return to_2d(ChunkedCSVReader(path, skip_header=1).read())
+
+    cases = [
+        ("np.loadtxt (no missing)", lambda: np.loadtxt(clean_path, delimiter=",", skiprows=1)),
+        ("chunked    (no missing)", lambda: chunked(clean_path)),
+        ("np.genfromtxt (5% missing)", lambda: np.genfromtxt(holes_path, delimiter=",", skip_header=1)),
+        ("chunked       (5% missing)", lambda: chunked(holes_path)),
+    ]
+    results = {}
+    for label, fn in cases:
+        seconds, results[label] = _best_of(fn)
+        print(f"{label:28s} {seconds:7.3f}s  {rows / seconds:12,.0f} rows/s  {size_mb / seconds:6.1f} MB/s")
+
+    print("\nloadtxt match:", np.allclose(results[cases[0][0]], results[cases[1][0]]))
+    print("genfromtxt match:", np.allclose(results[cases[2][0]], results[cases[3][0]], equal_nan=True))
+
+    # Bounded memory: only one block is ever resident
+    reader = ChunkedCSVReader(holes_path, block_rows=10_000, skip_header=1)
+    nan_count = sum(int(np.isnan(to_2d(block)).sum()) for block in reader)
+    print(f"Streaming NaN count with {reader._buffer.nbytes:,}-byte buffer: {nan_count:,}")
+
+    shutil.rmtree(tmpdir)
+    print("\nCleaned up temp directory.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import numpy as np
+import tempfile
+import os
+import shutil
+import json
+import struct
+import time
+
+
+# Self-describing raw binary container: many named arrays in one file, each
+# opened as a zero-copy np.memmap view.
+#
+# Layout:
+#   [magic 8B][index offset u64][index length u64][pad to 64B]
+#   [array 0 raw bytes][pad] [array 1 raw bytes][pad] ...
+#   [JSON index: name -> dtype (with byte order), shape, offset, nbytes]
+#
+# The index lives after the data so appending only touches the tail: new
+# arrays are written after the old index, then a new index, and only then is
+# the fixed header pointed at it. A failed append leaves the old index in
+# charge (the dead bytes of the old index are the price).
+#
+# Arrays are written with ndarray.tofile, straight from their own memory, so
+# saving a memmapped array does not first build a full in-memory copy.
+# Containers open read-only ("r"), writable in place ("r+") or copy-on-write
+# ("c"); np.memmap's "w+" would truncate the file, so it is refused.
+
+MAGIC = b"NPRAW\x00\x01\x00"
+_HEADER = struct.Struct("<8sQQ")
+ALIGN = 64
+
+
+def _aligned(pos):
+    return -(-pos // ALIGN) * ALIGN
+
+
+def _read_index(f):
+    magic, index_offset, index_length = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"Not a raw container (magic={magic!r})")
+    f.seek(index_offset)
+    return index_offset, json.loads(f.read(index_length))
+
+
+def _write_arrays(f, pos, index, arrays):
+    # Validate everything before the first byte is written
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in arrays.items()}
+    for name, arr in arrays.items():
+        if name in index:
+            raise KeyError(f"Array {name!r} already in container")
+        if arr.dtype.hasobject:
+            raise TypeError(f"Array {name!r} has object dtype; only raw data can be stored")
+    for name, arr in arrays.items():
+        pos = _aligned(pos)
+        f.seek(pos)
+        arr.tofile(f)
+        index[name] = {
+            # The .npy header's descr: byte order ("<f8", ">i2") and structured fields
+            "dtype": np.lib.format.dtype_to_descr(arr.dtype),
+            "shape": list(arr.shape),
+            "offset": pos,
+            "nbytes": arr.nbytes,
+        }
+        pos += arr.nbytes
+    return pos
+
+
+def _write_index(f, pos, index):
+    blob = json.dumps(index).encode()
+    f.seek(pos)
+    f.write(blob)
+    f.truncate()
+    f.seek(0)
+    f.write(_HEADER.pack(MAGIC, pos, len(blob)))
+
+
+def save(path, **arrays):
+    with open(path, "wb+") as f:
+        f.write(b"\x00" * ALIGN)
+        index = {}
+        pos = _write_arrays(f, ALIGN, index, arrays)
+        _write_index(f, pos, index)
+
+
+def append(path, **arrays):
+    with open(path, "rb+") as f:
+        _, index = _read_index(f)
+        # New data goes after the old index (f is at its end), which stays
+        # valid until the header moves
+        pos = _write_arrays(f, f.tell(), index, arrays)
+        _write_index(f, pos, index)
+
+
+class RawContainer:
+    def __init__(self, path, mode="r"):
+        if mode not in ("r", "r+", "c"):
+            raise ValueError(f"mode must be 'r', 'r+' or 'c', got {mode!r}")
+        self.path = path
+        self.mode = mode
+        with open(path, "rb") as f:
+            _, self.index = _read_index(f)
+
+    def keys(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def info(self, name):
+        entry = self.index[name]
+        return np.lib.format.descr_to_dtype(entry["dtype"]), tuple(entry["shape"]), entry["offset"]
+
+    def __getitem__(self, name):
+        dtype, shape, offset = self.info(name)
+        if 0 in shape:  # np.memmap refuses zero-byte mappings
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode=self.mode, offset=offset, shape=shape)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def load(path, mode="r"):
+    return RawContainer(path, mode)
+
+
+def main():
+    print("=" * 40)
+    print("       Raw Binary Container")
+    print("=" * 40, "\n")
+
+    tmpdir = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+
+    # 1. Round trip without knowing dtype/shape up front (cf. main.py section 6)
+
+    print("--- 1. Self-describing round trip ---\n")
+
+    original = np.arange(12, dtype=np.int16).reshape(3, 4)
+    big_endian = np.arange(5, dtype=">f8")
+    path = os.path.join(tmpdir, "arrays.raw")
+    save(path, grid=original, be=big_endian)
+
+    with load(path) as c:
+        print("Keys:", c.keys())
+        for name in c.keys():
+            dtype, shape, offset = c.info(name)
+            print(f"  {name}: dtype={dtype.str} shape={shape} offset={offset}")
+        grid = c["grid"]
+        print("Match:", np.array_equal(original, grid), "| type:", type(grid).__name__)
+        print("Byte order kept:", c["be"].dtype.str, c["be"][:])
+    print()
+
+    # 2. Append
+
+    print("--- 2. Append ---\n")
+
+    append(path, labels=np.array([3, 1, 2], dtype=np.uint8), empty=np.empty((0, 3)))
+    with load(path) as c:
+        print("Keys after append:", c.keys())
+        print("Old arrays intact:", np.array_equal(c["grid"], original))
+        print("labels:", c["labels"][:], "| empty:", c["empty"].shape)
+    try:
+        append(path, grid=original)
+    except KeyError as e:
+        print("Duplicate name:", e)
+    try:
+        load(path, mode="w+")
+    except ValueError as e:
+        print("Truncating mode:", e)
+    points = np.zeros(2, dtype=[("id", "<u4"), ("xy", ">f8", (2,))])
+    append(path, points=points)
+    with load(path) as c:
+        print("Structured dtype kept:", c["points"].dtype)
+    print()
+
+    # 3. Open latency vs np.load on .npz
+
+    print("--- 3. Open latency vs .npz ---\n")
+
+    arrays = {f"a{i}": rng.random((1_000, 1_000)) for i in range(16)}
+    npz_path = os.path.join(tmpdir, "arrays.npz")
+    raw_path = os.path.join(tmpdir, "arrays.raw")
+    np.savez(npz_path, **arrays)
+    save(raw_path, **arrays)
+    print(f"16 arrays x {arrays['a0'].nbytes / 2**20:.1f} MiB")
+
+    def open_npz():
+        with np.load(npz_path) as data:
+            return data["a7"][500, 500]
+
+    def open_raw():
+        with load(raw_path) as c:
+            return c["a7"][500, 500]
+
+    for label, fn in [("np.load(.npz)[name]", open_npz), ("raw container[name]", open_raw)]:
+        times = []
+        for _ in range(20):
+            start = time.perf_counter()
+            value = fn()
+            times.append(time.perf_counter() - start)
+        print(f"{label:22s} median {np.median(times) * 1e3:8.3f} ms  (value={value:.4f})")
+    print("Same value:", open_npz() == open_raw())
+
+    shutil.rmtree(tmpdir)
+    print("\nCleaned up temp directory.")
+
+
+if __name__ == "__main__":
+    main()
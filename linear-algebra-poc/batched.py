@@ -0,0 +1,239 @@
+import numpy as np
+import time
+
+
+# Batched small-matrix linear algebra on stacked (N, k, k) arrays.
+#
+# np.linalg already broadcasts over leading axes, but every matrix still goes
+# through a LAPACK call. For 2x2 and 3x3 det/solve (adjugate / Cramer's rule)
+# and 2x2 eig (characteristic polynomial) the closed forms are a handful of
+# whole-array ufunc ops on the (N,) columns of the batch instead. Larger sizes,
+# and 3x3 eig, use the batched np.linalg call.
+#
+# Nearly singular 2x2/3x3 systems (see _CRAMER_MIN_RATIO) are handed to
+# np.linalg.solve, whose pivoting keeps the accuracy Cramer's rule loses.
+#
+# Singular systems: with check=True a LinAlgError is raised like np.linalg.solve;
+# with check=False the affected rows come back as NaN so one bad system does not
+# sink the batch.
+
+
+def _as_batch(A):
+    A = np.asarray(A)
+    if A.ndim < 2 or A.shape[-1] != A.shape[-2]:
+        raise np.linalg.LinAlgError(f"Expected stacked square matrices (..., k, k), got {A.shape}")
+    return A
+
+
+def det(A):
+    A = _as_batch(A)
+    k = A.shape[-1]
+    if k == 2:
+        return A[..., 0, 0] * A[..., 1, 1] - A[..., 0, 1] * A[..., 1, 0]
+    if k == 3:
+        return _det3(A)
+    return np.linalg.det(A)
+
+
+def _det3(A):
+    a, b, c = A[..., 0, 0], A[..., 0, 1], A[..., 0, 2]
+    d, e, f = A[..., 1, 0], A[..., 1, 1], A[..., 1, 2]
+    g, h, i = A[..., 2, 0], A[..., 2, 1], A[..., 2, 2]
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+def _adjugate(A):
+    k = A.shape[-1]
+    adj = np.empty(A.shape, dtype=np.result_type(A, np.float64))
+    if k == 2:
+        adj[..., 0, 0] = A[..., 1, 1]
+        adj[..., 0, 1] = -A[..., 0, 1]
+        adj[..., 1, 0] = -A[..., 1, 0]
+        adj[..., 1, 1] = A[..., 0, 0]
+        return adj
+    # 3x3: adj[j, i] = cofactor(i, j), built from cyclic index shifts
+    for i in range(3):
+        i1, i2 = (i + 1) % 3, (i + 2) % 3
+        for j in range(3):
+            j1, j2 = (j + 1) % 3, (j + 2) % 3
+            adj[..., j, i] = A[..., i1, j1] * A[..., i2, j2] - A[..., i1, j2] * A[..., i2, j1]
+    return adj
+
+
+# |det A| / prod(row norms) lies in [0, 1] (Hadamard's inequality) and is
+# tiny when the rows are nearly dependent; below this the closed form loses
+# too many digits and those systems are solved by np.linalg.solve instead.
+_CRAMER_MIN_RATIO = 1e-8
+
+
+def _hadamard_ratio(A, d):
+    sq_norms = np.einsum("...ij,...ij->...i", A, A.conj()).real
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.abs(d) / np.sqrt(sq_norms.prod(axis=-1))
+
+
+def solve(A, b, check=True):
+    A = _as_batch(A)
+    b = np.asarray(b)
+    k = A.shape[-1]
+    # A 1-D b is one vector shared by every system, as in np.linalg.solve
+    vector = b.ndim == 1 or b.ndim == A.ndim - 1
+    rhs = b[..., None] if vector else b
+
+    if k in (2, 3):
+        d = det(A)
+        singular = d == 0
+        if check and singular.any():
+            raise np.linalg.LinAlgError(f"Singular matrix in {int(singular.sum())} of {singular.size} systems")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (_adjugate(A) @ rhs) / d[..., None, None]
+        x[np.broadcast_to(singular, x.shape[:-2])] = np.nan
+        # Cramer's rule has no pivoting: ill-conditioned systems go to LAPACK
+        ill = np.broadcast_to(~singular & (_hadamard_ratio(A, d) < _CRAMER_MIN_RATIO), x.shape[:-2])
+        if ill.any():
+            A_all = np.broadcast_to(A, x.shape[:-2] + A.shape[-2:])
+            x[ill] = np.linalg.solve(A_all[ill], np.broadcast_to(rhs, x.shape)[ill])
+    elif check:
+        x = np.linalg.solve(A, rhs)
+    else:
+        batch = np.broadcast_shapes(A.shape[:-2], rhs.shape[:-2])
+        x = np.full(batch + rhs.shape[-2:], np.nan)
+        # b may carry more batch axes than A: mask and index both at the full batch shape
+        ok = np.broadcast_to(np.linalg.det(A) != 0, batch)
+        A_all = np.broadcast_to(A, batch + A.shape[-2:])
+        x[ok] = np.linalg.solve(A_all[ok], np.broadcast_to(rhs, x.shape)[ok])
+    return x[..., 0] if vector else x
+
+
+def eig(A):
+    A = _as_batch(A)
+    if A.shape[-1] != 2:
+        return np.linalg.eig(A)
+
+    a, b = A[..., 0, 0], A[..., 0, 1]
+    c, d = A[..., 1, 0], A[..., 1, 1]
+    half_tr = (a + d) / 2
+    # ((a - d) / 2)^2 + bc equals half_tr^2 - det without cancelling for a >> d
+    disc = ((a - d) / 2) ** 2 + b * c
+    # Like np.linalg.eig: real output unless some eigenvalue is complex
+    if np.iscomplexobj(A) or (disc < 0).any():
+        disc = disc.astype(np.complex128)
+    root = np.sqrt(disc)
+    # half_tr - root cancels for the smaller eigenvalue: add root with the sign
+    # that grows |half_tr|, and get the other one from det = l1 * l2
+    plus = (half_tr.conj() * root).real >= 0
+    large = np.where(plus, half_tr + root, half_tr - root)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        small = np.where(large == 0, 0, (a * d - b * c) / large)
+    w = np.stack([np.where(plus, large, small), np.where(plus, small, large)], axis=-1)
+
+    # Eigenvectors are the columns of adj(A - lambda I) = [[d - l, -b], [-c, a - l]];
+    # take the larger one so near-diagonal matrices stay well conditioned
+    lam = w
+    x1, y1 = d[..., None] - lam, -np.broadcast_to(c[..., None], lam.shape)
+    x2, y2 = -np.broadcast_to(b[..., None], lam.shape), a[..., None] - lam
+    n1 = np.abs(x1) ** 2 + np.abs(y1) ** 2
+    n2 = np.abs(x2) ** 2 + np.abs(y2) ** 2
+    first = n1 >= n2
+    x, y = np.where(first, x1, x2), np.where(first, y1, y2)
+    norm = np.sqrt(np.maximum(n1, n2))
+    # A == lambda * I: every vector works, use the unit axes
+    scalar = norm == 0
+    x = np.where(scalar, np.array([1.0, 0.0]), x)
+    y = np.where(scalar, np.array([0.0, 1.0]), y)
+    norm = np.where(scalar, 1.0, norm)
+    v = np.stack([x / norm, y / norm], axis=-2)  # columns are eigenvectors, as in np.linalg.eig
+    return w, v
+
+
+def residual(A, x, b):
+    # Relative ||A @ x - b|| per system: the demo's `A @ x` check, for the whole batch
+    A, x, b = np.asarray(A), np.asarray(x), np.asarray(b)
+    vector = x.ndim == A.ndim - 1
+    Ax = (A @ x[..., None])[..., 0] if vector else A @ x
+    axes = (-1,) if vector else (-2, -1)
+    scale = np.linalg.norm(A, axis=(-2, -1)) * np.sqrt((np.abs(x) ** 2).sum(axis=axes)) + np.finfo(float).tiny
+    return np.sqrt((np.abs(Ax - b) ** 2).sum(axis=axes)) / scale
+
+
+def eig_residual(A, w, v):
+    # max_i ||A v_i - w_i v_i|| per matrix
+    Av = np.asarray(A) @ v
+    return np.linalg.norm(Av - v * w[..., None, :], axis=-2).max(axis=-1)
+
+
+def main():
+    print("=== Batched Small-matrix Linear Algebra ===\n")
+
+    rng = np.random.default_rng(0)
+
+    # 1. Same 2x2 system as main.py, stacked with a few more
+
+    print("=== Demo matrices ===")
+
+    A = np.array([[[1, 2], [3, 4]], [[5, 6], [7, 8]], [[2, 0], [0, 3]]], dtype=float)
+    b = np.array([[5, 11], [1, 2], [4, 9]], dtype=float)
+
+    print("det:", det(A), "| np.linalg.det:", np.linalg.det(A))
+    x = solve(A, b)
+    print("solve:\n", x)
+    print("A @ x:\n", (A @ x[..., None])[..., 0])
+    print("relative residuals:", residual(A, x, b))
+
+    w, v = eig(A)
+    print("eigenvalues:\n", w)
+    print("eig residuals (A v - λ v):", eig_residual(A, w, v))
+
+    rot = np.array([[[0.0, -1.0], [1.0, 0.0]], [[2.0, 0.0], [0.0, 2.0]]])
+    w, v = eig(rot)
+    print("rotation / 2I eigenvalues:", w, "| residual:", eig_residual(rot, w, v))
+
+    singular = np.array([[[1.0, 2.0], [2.0, 4.0]], [[1.0, 0.0], [0.0, 1.0]]])
+    print("singular batch, check=False:", solve(singular, np.ones((2, 2)), check=False).tolist())
+    try:
+        solve(singular, np.ones((2, 2)))
+    except np.linalg.LinAlgError as e:
+        print("singular batch, check=True:", e)
+    print()
+
+    # 2. Benchmark
+
+    print("=== Benchmark ===")
+
+    n = 200_000
+    loop_n = 5_000
+    print(f"N = {n:,} systems (Python loop timed on {loop_n:,})\n")
+    print(f"{'op':6s} {'k':>2s} {'loop us/sys':>12s} {'np.linalg batched':>18s} {'this module':>12s} {'max residual':>13s}")
+
+    def per_system(fn, count):
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) / count * 1e6
+
+    for k in [2, 3, 8]:
+        A = rng.normal(size=(n, k, k)) + k * np.eye(k)
+        b = rng.normal(size=(n, k))
+
+        loop = per_system(lambda: [np.linalg.solve(A[i], b[i]) for i in range(loop_n)], loop_n)
+        lapack = per_system(lambda: np.linalg.solve(A, b[..., None]), n)
+        ours = per_system(lambda: solve(A, b), n)
+        res = residual(A, solve(A, b), b).max()
+        print(f"{'solve':6s} {k:2d} {loop:12.2f} {lapack:18.3f} {ours:12.3f} {res:13.2e}")
+
+        loop = per_system(lambda: [np.linalg.det(A[i]) for i in range(loop_n)], loop_n)
+        lapack = per_system(lambda: np.linalg.det(A), n)
+        ours = per_system(lambda: det(A), n)
+        err = np.abs(det(A) - np.linalg.det(A)).max()
+        print(f"{'det':6s} {k:2d} {loop:12.2f} {lapack:18.3f} {ours:12.3f} {err:13.2e}")
+
+        loop = per_system(lambda: [np.linalg.eig(A[i]) for i in range(loop_n)], loop_n)
+        lapack = per_system(lambda: np.linalg.eig(A), n)
+        ours = per_system(lambda: eig(A), n)
+        w, v = eig(A)
+        res = eig_residual(A, w, v).max()
+        print(f"{'eig':6s} {k:2d} {loop:12.2f} {lapack:18.3f} {ours:12.3f} {res:13.2e}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import numpy as np
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+
+
+# Factor once, solve many: a solver that caches LU / Cholesky factorizations.
+#
+# np.linalg.solve(A, b) refactorizes A on every call (O(n^3)); with the
+# factors at hand each new right-hand side costs two triangular solves
+# (O(n^2)). NumPy has no triangular solver, so the triangular solves are
+# blocked: the inverse of every diagonal block is computed once at factor
+# time and each solve is a short loop of matrix products.
+#
+# Exactly Hermitian (symmetric, for real A) positive definite matrices get
+# np.linalg.cholesky; everything else a blocked right-looking LU with partial
+# pivoting (PA = LU).
+# The LU is written in NumPy, so factorizing is slower than LAPACK's; a miss
+# is therefore answered by np.linalg.solve and the factors pay off from the
+# first hit on. Factors keep A's dtype (at least float64), so complex systems
+# stay complex, and solve() computes in np.result_type(A, b).
+#
+# seconds_saved estimates the net gain, key hashing included: each hit saves
+# the timed np.linalg.solve of that matrix's miss minus the hit's own solve and
+# key time; each miss costs its factorization and key time. solve_seconds is
+# the measured wall time of all solve() calls, to check the estimate against.
+
+BLOCK = 64
+
+
+def _diag_block_inverses(T, block):
+    n = T.shape[0]
+    return [np.linalg.inv(T[i:i + block, i:i + block]) for i in range(0, n, block)]
+
+
+def _forward(L, inv_blocks, b, block):
+    # Solve L x = b for lower-triangular L, block row by block row
+    x = np.empty(b.shape, dtype=np.result_type(L, b))
+    for k, i in enumerate(range(0, L.shape[0], block)):
+        rhs = b[i:i + block] - L[i:i + block, :i] @ x[:i] if i else b[i:i + block]
+        x[i:i + block] = inv_blocks[k] @ rhs
+    return x
+
+
+def _backward(U, inv_blocks, b, block):
+    # Solve U x = b for upper-triangular U, from the last block row up
+    n = U.shape[0]
+    x = np.empty(b.shape, dtype=np.result_type(U, b))
+    starts = list(range(0, n, block))
+    for k in range(len(starts) - 1, -1, -1):
+        i = starts[k]
+        j = i + block
+        rhs = b[i:j] - U[i:j, j:] @ x[j:] if j < n else b[i:j]
+        x[i:j] = inv_blocks[k] @ rhs
+    return x
+
+
+def lu_factor(A, block=BLOCK):
+    a = np.array(A, dtype=np.result_type(A, np.float64))
+    n = a.shape[0]
+    perm = np.arange(n)
+    for j0 in range(0, n, block):
+        j1 = min(j0 + block, n)
+        # Panel: unblocked LU on columns j0:j1, full-row swaps
+        for j in range(j0, j1):
+            p = j + int(np.argmax(np.abs(a[j:, j])))
+            if a[p, j] == 0:
+                raise np.linalg.LinAlgError("Singular matrix")
+            if p != j:
+                a[[j, p]] = a[[p, j]]
+                perm[[j, p]] = perm[[p, j]]
+            a[j + 1:, j] /= a[j, j]
+            a[j + 1:, j + 1:j1] -= np.outer(a[j + 1:, j], a[j, j + 1:j1])
+        if j1 < n:
+            # U12 = L11^-1 A12, then the BLAS-3 trailing update
+            L11 = np.tril(a[j0:j1, j0:j1], -1) + np.eye(j1 - j0)
+            a[j0:j1, j1:] = np.linalg.solve(L11, a[j0:j1, j1:])
+            a[j1:, j1:] -= a[j1:, j0:j1] @ a[j0:j1, j1:]
+    return a, perm
+
+
+class Factorization:
+    def __init__(self, A, block=BLOCK, assume_spd=None):
+        A = np.asarray(A)
+        A = A.astype(np.result_type(A, np.float64), copy=False)
+        if A.ndim != 2 or A.shape[0] != A.shape[1]:
+            raise np.linalg.LinAlgError(f"Expected a square matrix, got shape {A.shape}")
+        self.n = A.shape[0]
+        self.block = block
+        start = time.perf_counter()
+
+        self.kind = "lu"
+        # Only exactly Hermitian matrices: cholesky reads the lower triangle
+        # alone, so a nearly symmetric A would be silently solved as another matrix
+        if assume_spd is not False and (assume_spd or np.array_equal(A, A.conj().T)):
+            try:
+                L = np.linalg.cholesky(A)
+                self.kind = "cholesky"
+            except np.linalg.LinAlgError:
+                if assume_spd:
+                    raise
+
+        if self.kind == "cholesky":
+            self.lower, self.upper = L, np.ascontiguousarray(L.conj().T)
+            self.perm = None
+        else:
+            lu, self.perm = lu_factor(A, block)
+            self.lower = np.tril(lu, -1) + np.eye(self.n)
+            self.upper = np.triu(lu)
+        self.lower_inv = _diag_block_inverses(self.lower, block)
+        self.upper_inv = _diag_block_inverses(self.upper, block)
+        self.factor_seconds = time.perf_counter() - start
+
+    @property
+    def nbytes(self):
+        blocks = sum(b.nbytes for b in self.lower_inv + self.upper_inv)
+        return self.lower.nbytes + self.upper.nbytes + blocks
+
+    def solve(self, b):
+        # b may be (n,) or (n, m): m right-hand sides solved together
+        b = np.asarray(b)
+        if b.shape[0] != self.n:
+            raise ValueError(f"b has {b.shape[0]} rows, matrix is {self.n}x{self.n}")
+        if self.perm is not None:
+            b = b[self.perm]
+        y = _forward(self.lower, self.lower_inv, b, self.block)
+        return _backward(self.upper, self.upper_inv, y, self.block)
+
+
+def content_key(A):
+    A = np.ascontiguousarray(A)
+    # A full pass over A per call (sha256 measured ~1.2 GB/s here, ahead of
+    # sha1, md5 and blake2b); pass an explicit key, or use key="id", to skip it
+    h = hashlib.sha256(A.view(np.uint8).ravel())
+    return (A.shape, A.dtype.str, h.hexdigest())
+
+
+class FactorizedSolver:
+    def __init__(self, max_bytes=512 * 2**20, key="content", block=BLOCK):
+        if key not in ("content", "id"):
+            raise ValueError("key must be 'content' or 'id'")
+        self.max_bytes = max_bytes
+        self.key = key
+        self.block = block
+        self._cache = OrderedDict()
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.seconds_saved = 0.0
+        self.key_seconds = 0.0
+        self.solve_seconds = 0.0  # wall time spent inside solve()
+        self._direct_seconds = {}  # key -> measured np.linalg.solve time for that matrix
+        self._refs = {}  # key="id": key -> weakref to the matrix
+
+    def _key(self, A):
+        # "id" is O(1) but only safe when cached matrices are never mutated.
+        # The entry holds a weak reference and is dropped when A is collected,
+        # so a new array that reuses the id never sees a stale factorization.
+        if self.key == "id":
+            if not isinstance(A, np.ndarray):
+                raise TypeError("key='id' needs ndarray matrices, got " + type(A).__name__)
+            key = ("id", id(A), A.shape)
+            ref = self._refs.get(key)
+            if ref is not None and ref() is not A:
+                self._forget(key)
+            return key
+        start = time.perf_counter()
+        key = content_key(A)
+        self.key_seconds += time.perf_counter() - start
+        return key
+
+    def _lookup(self, A, key):
+        # (key, cached factorization or None, seconds spent on the key)
+        start = time.perf_counter()
+        key = self._key(A) if key is None else key
+        key_s = time.perf_counter() - start
+        fact = self._cache.get(key)
+        if fact is not None:
+            self._cache.move_to_end(key)
+        return key, fact, key_s
+
+    def _store(self, key, A):
+        fact = Factorization(A, block=self.block)
+        self._cache[key] = fact
+        self.cached_bytes += fact.nbytes
+        if self.key == "id" and key[0] == "id":
+            self._refs[key] = weakref.ref(A, lambda _, key=key: self._forget(key))
+        while self.cached_bytes > self.max_bytes and len(self._cache) > 1:
+            old_key = next(iter(self._cache))
+            self._forget(old_key)
+            self.evictions += 1
+        return fact
+
+    def _forget(self, key):
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self.cached_bytes -= old.nbytes
+        self._direct_seconds.pop(key, None)
+        self._refs.pop(key, None)
+
+    def factorization(self, A, key=None):
+        key, fact, _ = self._lookup(A, key)
+        if fact is not None:
+            self.hits += 1
+            return fact
+        self.misses += 1
+        return self._store(key, A)
+
+    def solve(self, A, b, key=None):
+        start = time.perf_counter()
+        key, fact, key_s = self._lookup(A, key)
+        if fact is None:
+            # Miss: answer with LAPACK and time it, so hits can report what they saved
+            self.misses += 1
+            solve_start = time.perf_counter()
+            x = np.linalg.solve(A, b)
+            self._direct_seconds[key] = time.perf_counter() - solve_start
+            fact = self._store(key, A)
+            self.seconds_saved -= key_s + fact.factor_seconds
+        else:
+            self.hits += 1
+            solve_start = time.perf_counter()
+            x = fact.solve(b)
+            direct = self._direct_seconds.get(key)
+            if direct is not None:
+                self.seconds_saved += direct - (time.perf_counter() - solve_start) - key_s
+        self.solve_seconds += time.perf_counter() - start
+        return x
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions, "cached": len(self._cache),
+                "cached_MiB": self.cached_bytes / 2**20,
+                "seconds_saved": self.seconds_saved,
+                "solve_seconds": self.solve_seconds,
+                "hashing_seconds": self.key_seconds}
+
+
+def main():
+    print("=== Factorization Cache ===\n")
+
+    rng = np.random.default_rng(0)
+
+    # 1. Same system as main.py section 5
+
+    print("=== Demo system ===")
+
+    A = np.array([[1, 2], [3, 4]])
+    b = np.array([5, 11])
+    solver = FactorizedSolver()
+    x = solver.solve(A, b)
+    print("Solution x:", x, "| np.linalg.solve:", np.linalg.solve(A, b))
+    print("A @ x =", A @ x)
+    x2 = solver.solve(A.copy(), np.array([1, 2]))
+    print("Second rhs (equal content, new object):", x2, "| kind:", solver.factorization(A).kind)
+    print("Stats:", {k: v for k, v in solver.stats().items() if k in ("hits", "misses")})
+
+    spd = np.array([[4.0, 1.0], [1.0, 3.0]])
+    print("SPD matrix ->", Factorization(spd).kind)
+    Z = np.array([[2 + 1j, 1], [1j, 3]])
+    z = np.array([1, 2j])
+    print("Complex system:", Factorization(Z).solve(z), "| np.linalg.solve:", np.linalg.solve(Z, z))
+    H = np.array([[4, 1 - 1j], [1 + 1j, 3]])
+    print("Hermitian PD ->", Factorization(H).kind, "| max diff:",
+          np.abs(Factorization(H).solve(z) - np.linalg.solve(H, z)).max())
+    print()
+
+    # 2. Accuracy on larger matrices
+
+    print("=== Accuracy ===")
+
+    for kind, M in [("general", rng.normal(size=(500, 500))),
+                    ("spd", (lambda G: G @ G.T + 500 * np.eye(500))(rng.normal(size=(500, 500))))]:
+        fact = Factorization(M)
+        B = rng.normal(size=(500, 8))
+        X = fact.solve(B)
+        ref = np.linalg.solve(M, B)
+        rel = np.linalg.norm(M @ X - B) / (np.linalg.norm(M) * np.linalg.norm(X))
+        print(f"{kind:8s} -> {fact.kind:8s} | relative residual {rel:.1e} | "
+              f"max diff vs np.linalg.solve {np.abs(X - ref).max():.1e}")
+    print()
+
+    # 3. Workload: a few hundred matrices, a stream of right-hand sides
+
+    print("=== Repeated solves ===")
+
+    n, n_matrices, n_solves = 400, 50, 2_000
+    mats = [rng.normal(size=(n, n)) + n ** 0.5 * np.eye(n) for _ in range(n_matrices)]
+    picks = rng.integers(0, n_matrices, n_solves)
+    rhs = rng.normal(size=(n_solves, n))
+
+    start = time.perf_counter()
+    ref = [np.linalg.solve(mats[i], r) for i, r in zip(picks, rhs)]
+    direct_s = time.perf_counter() - start
+
+    for key in ["content", "id"]:
+        solver = FactorizedSolver(key=key)
+        start = time.perf_counter()
+        out = [solver.solve(mats[i], r) for i, r in zip(picks, rhs)]
+        cached_s = time.perf_counter() - start
+        err = max(np.abs(o - r).max() for o, r in zip(out, ref))
+        s = solver.stats()
+        print(f"key={key!r:9s}: {cached_s:.2f}s vs np.linalg.solve {direct_s:.2f}s "
+              f"(measured saving {direct_s - cached_s:.2f}s) | hits {s['hits']} / misses {s['misses']} | "
+              f"estimated saving {s['seconds_saved']:.2f}s, hashing included ({s['hashing_seconds']:.2f}s) | "
+              f"max diff {err:.1e}")
+
+    # Batched right-hand sides against one matrix
+    B = rng.normal(size=(n, 256))
+    start = time.perf_counter()
+    np.linalg.solve(mats[0], B)
+    direct_s = time.perf_counter() - start
+    fact = solver.factorization(mats[0])
+    start = time.perf_counter()
+    fact.solve(B)
+    print(f"256 rhs at once: cached factors {(time.perf_counter() - start) * 1e3:.2f} ms "
+          f"vs np.linalg.solve {direct_s * 1e3:.2f} ms")
+
+    # Memory bound: evicts least recently used factors
+    small = FactorizedSolver(max_bytes=5 * Factorization(mats[0]).nbytes)
+    for M in mats[:20]:
+        small.solve(M, rhs[0])
+    print("Bounded cache:", {k: small.stats()[k] for k in ("cached", "evictions")}, "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import numpy as np
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Per-group count / sum / mean / min / max over masked data, in one pass.
+#
+# Input is data, integer labels (broadcast against data, e.g. one label per
+# column of a sensor grid) and a bool mask (True = masked, as in np.ma), a
+# sentinel value (NaN matches NaN), an np.ma array's own mask, or several of
+# these at once. Masked cells are dropped, and the rest are scattered
+# into group slots with no Python loop over groups:
+#   count, sum  np.bincount(labels, weights=...)
+#   min, max    np.minimum.at / np.maximum.at on per-group accumulators
+#
+# Large inputs are cut into slabs along axis 0 of about `chunk` elements, so
+# temporaries stay small. With workers > 1 the slabs are reduced on a thread
+# pool and their partials combined (add for count/sum, minimum/maximum for
+# min/max). Chunking alone already helps (smaller, cache-friendlier
+# temporaries); how much threads add depends on the cores available and on
+# how much of bincount / ufunc.at the NumPy build runs without the GIL.
+#
+# Sums and extremes are accumulated in float64. mean, min and max come back
+# as np.ma arrays with empty groups masked, like section 8's masked means.
+
+CHUNK = 1 << 20
+
+
+def _partial(data, labels, mask, n_groups):
+    labels = labels.ravel()
+    data = data.ravel()
+    if mask is not None:
+        keep = ~mask.ravel()
+        labels, data = labels[keep], data[keep]
+    count = np.bincount(labels, minlength=n_groups)
+    total = np.bincount(labels, weights=data, minlength=n_groups)
+    lo = np.full(n_groups, np.inf)
+    hi = np.full(n_groups, -np.inf)
+    np.minimum.at(lo, labels, data)
+    np.maximum.at(hi, labels, data)
+    return count, total, lo, hi
+
+
+def group_reduce(data, labels, mask=None, sentinel=None, n_groups=None, workers=1, chunk=CHUNK):
+    if np.ma.isMaskedArray(data):
+        # Keep np.ma's mask: it joins (OR) any explicit mask
+        data_mask = np.ma.getmaskarray(data)
+        mask = data_mask if mask is None else data_mask | np.asarray(mask, dtype=bool)
+        data = np.ma.getdata(data)
+    data = np.asarray(data)
+    labels = np.asarray(labels)
+    if labels.dtype.kind not in "iu":
+        raise TypeError(f"labels must be integers, got {labels.dtype}")
+    if labels.size and labels.min() < 0:
+        raise ValueError("labels must be non-negative")
+    if n_groups is None:
+        n_groups = int(labels.max()) + 1 if labels.size else 0
+    elif labels.size and labels.max() >= n_groups:
+        raise ValueError(f"label {labels.max()} out of range for {n_groups} groups")
+    labels = np.broadcast_to(labels, data.shape)
+    if mask is not None:
+        mask = np.broadcast_to(np.asarray(mask, dtype=bool), data.shape)
+
+    if data.ndim == 0:
+        data, labels = data.reshape(1), labels.reshape(1)
+        mask = None if mask is None else mask.reshape(1)
+    # d == nan is never true, so a NaN sentinel is matched with np.isnan
+    nan_sentinel = sentinel is not None and np.asarray(sentinel).dtype.kind in "fc" and bool(np.isnan(sentinel))
+    row = max(data[0].size if len(data) else 1, 1)
+    rows = max(chunk // row, 1)
+
+    def work(i):
+        d, l = data[i:i + rows], labels[i:i + rows]
+        m = None if mask is None else mask[i:i + rows]
+        if sentinel is not None:
+            hit = np.isnan(d) if nan_sentinel else d == sentinel
+            m = hit if m is None else m | hit
+        return _partial(d, l, m, n_groups)
+
+    starts = range(0, len(data), rows)
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(work, starts))
+    else:
+        parts = [work(i) for i in starts]
+
+    count = np.sum([p[0] for p in parts], axis=0, dtype=np.int64) if parts else np.zeros(n_groups, np.int64)
+    total = np.sum([p[1] for p in parts], axis=0) if parts else np.zeros(n_groups)
+    lo = np.minimum.reduce([p[2] for p in parts]) if parts else np.full(n_groups, np.inf)
+    hi = np.maximum.reduce([p[3] for p in parts]) if parts else np.full(n_groups, -np.inf)
+    empty = count == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return {
+        "count": count,
+        "sum": total,
+        "mean": np.ma.array(mean, mask=empty),
+        "min": np.ma.array(lo, mask=empty),
+        "max": np.ma.array(hi, mask=empty),
+    }
+
+
+def loop_reduce(masked, labels, n_groups):
+    # The per-group loop this replaces: slice the np.ma array once per group
+    labels = np.broadcast_to(labels, masked.shape)
+    out = {k: np.ma.masked_all(n_groups) for k in ("mean", "min", "max")}
+    count = np.zeros(n_groups, dtype=np.int64)
+    for g in range(n_groups):
+        part = masked[labels == g]
+        count[g] = part.count()
+        if count[g]:
+            out["mean"][g], out["min"][g], out["max"][g] = part.mean(), part.min(), part.max()
+    out["count"] = count
+    return out
+
+
+def _same(a, b):
+    return (np.array_equal(a["count"], b["count"])
+            and all(np.ma.allclose(a[k], b[k]) for k in ("mean", "min", "max")))
+
+
+def main():
+    print("=== Masked Group-by ===\n")
+
+    # 1. Section 8 grid, one group label per column
+
+    print("=== Section 8 grid by column group ===")
+
+    grid = np.array([
+        [1, 2, -1],
+        [4, -1, 6],
+        [7, 8, 9]
+    ])
+    column_group = np.array([0, 0, 1])  # columns 0 and 1 are sensor group 0
+    res = group_reduce(grid, column_group, sentinel=-1)
+    masked_grid = np.ma.masked_equal(grid, -1)
+    print("Grid:\n", grid)
+    print("Column groups:", column_group)
+    print("Group means:", res["mean"], "| np.ma by hand:",
+          [float(masked_grid[:, :2].mean()), float(masked_grid[:, 2].mean())])
+    print("Group count/min/max:", res["count"], res["min"], res["max"])
+    print("Same with a mask:", group_reduce(grid, column_group, mask=grid == -1)["mean"])
+    print("np.ma input keeps its mask:", group_reduce(masked_grid, column_group)["mean"],
+          "| NaN sentinel:", group_reduce(np.where(grid == -1, np.nan, grid), column_group, sentinel=np.nan)["mean"])
+    print("Unused group 2 is masked:", group_reduce(grid, column_group, sentinel=-1, n_groups=3)["mean"])
+    print()
+
+    # 2. Sensor grid against the per-group np.ma loop
+
+    print("=== Sensor grid ===")
+
+    rng = np.random.default_rng(0)
+    rows, cols, n_groups = 2_000, 5_000, 200
+    data = rng.normal(20, 5, (rows, cols))
+    data[rng.random((rows, cols)) < 0.1] = -999
+    sensor_group = rng.integers(0, n_groups, cols)
+
+    start = time.perf_counter()
+    ref = loop_reduce(np.ma.masked_equal(data, -999), sensor_group, n_groups)
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    res = group_reduce(data, sensor_group, sentinel=-999, n_groups=n_groups)
+    vec_s = time.perf_counter() - start
+    print(f"{rows:,} x {cols:,} cells, {n_groups} groups of columns:")
+    print(f"  np.ma loop over groups: {loop_s * 1e3:7.0f} ms")
+    print(f"  group_reduce          : {vec_s * 1e3:7.0f} ms  ({loop_s / vec_s:.0f}x) | same: {_same(res, ref)}")
+    print()
+
+    # 3. Per-cell labels, chunked and threaded
+
+    print("=== Chunked and threaded ===")
+    print(f"({os.cpu_count()} CPU(s) available)")
+
+    n, n_groups = 30_000_000, 10_000
+    values = rng.random(n)
+    labels = rng.integers(0, n_groups, n)
+    mask = rng.random(n) < 0.05
+
+    one = group_reduce(values, labels, mask=mask, n_groups=n_groups, chunk=n)
+    workers = 4
+    for label, kw in [("one pass, unchunked", {"chunk": n}),
+                      ("chunked, 1 thread", {}),
+                      (f"chunked, {workers} threads", {"workers": workers})]:
+        start = time.perf_counter()
+        res = group_reduce(values, labels, mask=mask, n_groups=n_groups, **kw)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>22}: {n / elapsed / 1e6:6.1f} M elements/s | same as one pass: {_same(res, one)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import numpy as np
+import time
+import tracemalloc
+
+
+# Masked array with a bit-packed mask.
+#
+# np.ma keeps one bool byte per element next to the data, so for a float32
+# grid the mask is a quarter of the data again (an eighth for float64), and
+# every reduction builds masked temporaries the size of the whole array.
+# Here the mask is np.packbits'ed (True = masked, as in np.ma): one bit per
+# element, 1/8 of the np.ma mask.
+#
+# Reductions walk the data in slabs along axis 0 of about BLOCK elements.
+# Each slab's bits are unpacked to a small bool block. The masked cells are
+# then replaced by a sentinel that cannot change the result: 0 for sum, the
+# dtype's largest value for min, its smallest for max. Last, the slab is
+# reduced with the plain ufunc, which is faster than reducing with where=.
+# Results for axis=0 and axis=None are combined across slabs; other axes are
+# concatenated. A full count (axis=None) is a popcount of the packed bits.
+#
+# Results follow np.ma: a reduction over nothing but masked cells is masked
+# (np.ma.masked for scalars, a masked cell in axis results), and mean divides
+# by the valid count. Reductions over size-0 arrays are masked the same way.
+
+BLOCK = 1 << 20
+
+
+def _neutral(dtype, ufunc):
+    if ufunc is np.add:
+        return dtype.type(0)
+    if dtype.kind == "b":
+        return np.True_ if ufunc is np.minimum else np.False_
+    if dtype.kind == "f":
+        return dtype.type(np.inf if ufunc is np.minimum else -np.inf)
+    info = np.iinfo(dtype)
+    return info.max if ufunc is np.minimum else info.min
+
+
+class PackedMaskedArray:
+    def __init__(self, data, mask=None):
+        self.data = np.ascontiguousarray(data)
+        if mask is None:
+            mask = np.zeros(self.data.shape, dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != self.data.shape:
+            mask = np.broadcast_to(mask, self.data.shape)
+        self.bits = np.packbits(mask, axis=None, bitorder="little")
+
+    @classmethod
+    def _from_bits(cls, data, bits):
+        self = cls.__new__(cls)
+        self.data, self.bits = data, bits
+        return self
+
+    @classmethod
+    def masked_where(cls, condition, data):
+        # condition(block) -> bool block; evaluated BLOCK elements at a time
+        data = np.ascontiguousarray(data)
+        flat = data.reshape(-1)
+        bits = np.empty((flat.size + 7) // 8, dtype=np.uint8)
+        step = BLOCK - BLOCK % 8
+        for start in range(0, flat.size, step):
+            block = flat[start:start + step]
+            bits[start // 8:(start + len(block) + 7) // 8] = np.packbits(condition(block), bitorder="little")
+        return cls._from_bits(data, bits)
+
+    @classmethod
+    def masked_equal(cls, data, value):
+        return cls.masked_where(lambda b: b == value, data)
+
+    @classmethod
+    def masked_invalid(cls, data):
+        return cls.masked_where(lambda b: ~np.isfinite(b), data)
+
+    @classmethod
+    def masked_outside(cls, data, lo, hi):
+        return cls.masked_where(lambda b: (b < lo) | (b > hi), data)
+
+    @classmethod
+    def from_ma(cls, m):
+        return cls(np.ma.getdata(m), np.ma.getmaskarray(m))
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def size(self):
+        return self.data.size
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.bits.nbytes
+
+    def _mask(self, start, stop):
+        # Unpacked mask of flat elements [start, stop)
+        first = start // 8
+        bits = np.unpackbits(self.bits[first:(stop + 7) // 8], bitorder="little")
+        return bits[start - 8 * first:stop - 8 * first].view(bool)
+
+    @property
+    def mask(self):
+        return self._mask(0, self.size).reshape(self.shape)
+
+    def _slabs(self):
+        # (slab of data along axis 0, its bool mask), about BLOCK elements each
+        if self.data.ndim == 0:
+            yield self.data, self._mask(0, 1).reshape(())
+            return
+        row = max(self.size // max(len(self.data), 1), 1)
+        rows = max(BLOCK // row, 1)
+        for i in range(0, len(self.data), rows):
+            slab = self.data[i:i + rows]
+            yield slab, self._mask(i * row, i * row + slab.size).reshape(slab.shape)
+
+    def _reduce(self, ufunc, axis):
+        # (ufunc over valid cells, valid count) along axis
+        if axis is not None:
+            axis = axis + self.data.ndim if axis < 0 else axis
+            if not 0 <= axis < self.data.ndim:
+                raise np.exceptions.AxisError(axis, self.data.ndim)
+        dtype = self.data.dtype
+        if self.size == 0:
+            # Nothing to reduce: every output cell is empty, hence masked
+            shape = np.add.reduce(np.zeros(self.shape, dtype=bool), axis=axis).shape
+            return np.zeros(shape, dtype=dtype), np.zeros(shape, dtype=np.int64)
+        if ufunc is np.add:
+            dtype = np.add.reduce(np.zeros(1, dtype)).dtype  # small ints sum as int64, like np.sum
+        fill = _neutral(self.data.dtype, ufunc)
+        values, counts = [], []
+        for slab, mask in self._slabs():
+            filled = np.where(mask, fill, slab)
+            values.append(ufunc.reduce(filled, axis=axis, dtype=dtype))
+            counts.append(np.count_nonzero(~mask, axis=axis))
+        if axis is None or axis == 0:
+            return ufunc.reduce(values, axis=0), np.sum(counts, axis=0)
+        return np.concatenate(values), np.concatenate(counts)
+
+    def _result(self, values, counts):
+        empty = counts == 0
+        if np.ndim(values) == 0:
+            return np.ma.masked if empty else values
+        return PackedMaskedArray(values, empty)
+
+    def count(self, axis=None):
+        if axis is None:
+            return self.size - int(np.bitwise_count(self.bits).sum())
+        return self._reduce(np.add, axis)[1]
+
+    def sum(self, axis=None):
+        return self._result(*self._reduce(np.add, axis))
+
+    def min(self, axis=None):
+        return self._result(*self._reduce(np.minimum, axis))
+
+    def max(self, axis=None):
+        return self._result(*self._reduce(np.maximum, axis))
+
+    def mean(self, axis=None):
+        total, counts = self._reduce(np.add, axis)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._result(total / counts, counts)
+
+    def filled(self, fill_value=0):
+        out = self.data.copy()
+        flat = out.reshape(-1)
+        for start in range(0, self.size, BLOCK):
+            stop = min(start + BLOCK, self.size)
+            np.copyto(flat[start:stop], fill_value, where=self._mask(start, stop), casting="unsafe")
+        return out
+
+    def to_ma(self):
+        return np.ma.array(self.data, mask=self.mask)
+
+    def __repr__(self):
+        return f"PackedMaskedArray({self.to_ma()!r})"
+
+    def __str__(self):
+        return str(self.to_ma())
+
+
+def _peak(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def _best(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("=== Bit-packed Masked Arrays ===\n")
+
+    # 1. Section 4 temperatures
+
+    print("=== Section 4 operations ===")
+
+    temps = np.array([22.5, 23.1, -999.0, 24.0, -999.0, 25.5, 21.0])
+    packed = PackedMaskedArray.masked_equal(temps, -999.0)
+    ref = np.ma.masked_equal(temps, -999.0)
+
+    print("Packed:", packed, "| mask bits:", np.binary_repr(packed.bits[0], 8)[::-1])
+    for op in ("mean", "max", "min", "sum", "count"):
+        print(f"{op:>5}: {getattr(packed, op)()!s:>18} | np.ma: {getattr(ref, op)()}")
+    print("Filled with 0:", packed.filled(0))
+    print()
+
+    # 2. Section 8 grid, axis reductions
+
+    print("=== Section 8 grid ===")
+
+    grid = np.array([[1, 2, -1], [4, -1, 6], [7, 8, 9]])
+    g = PackedMaskedArray.masked_equal(grid, -1)
+    ref = np.ma.masked_equal(grid, -1)
+    print("Column means:", g.mean(axis=0), "| np.ma:", ref.mean(axis=0))
+    print("Row means:", g.mean(axis=1), "| np.ma:", ref.mean(axis=1))
+    print("Row max:", g.max(axis=1), "| counts per column:", g.count(axis=0))
+
+    allmasked = PackedMaskedArray.masked_equal(np.array([[-1, 3], [-1, 5]]), -1)
+    print("All-masked column -> masked:", allmasked.min(axis=0), "| np.ma:",
+          np.ma.masked_equal([[-1, 3], [-1, 5]], -1).min(axis=0))
+    print()
+
+    # 3. Sensor grid: memory and speed against np.ma
+
+    print("=== Sensor grid vs np.ma ===")
+
+    rng = np.random.default_rng(0)
+    rows, cols = 4_000, 5_000
+    data = rng.normal(20, 5, (rows, cols)).astype(np.float32)
+    data[rng.random((rows, cols)) < 0.1] = -999.0
+
+    ma = np.ma.masked_equal(data, -999.0)
+    pm = PackedMaskedArray.masked_equal(data, -999.0)
+    print(f"{rows:,} x {cols:,} float32, {pm.size - pm.count():,} masked cells")
+    print(f"mask bytes: np.ma {ma.mask.nbytes / 2**20:6.1f} MiB | packed {pm.bits.nbytes / 2**20:6.1f} MiB "
+          f"(data {data.nbytes / 2**20:.1f} MiB)")
+
+    build_ma = _best(lambda: np.ma.masked_equal(data, -999.0))
+    build_pm = _best(lambda: PackedMaskedArray.masked_equal(data, -999.0))
+    print(f"{'masked_equal':>14}: np.ma {build_ma * 1e3:7.1f} ms | packed {build_pm * 1e3:7.1f} ms")
+
+    ops = [("mean", {}), ("sum", {}), ("min", {}), ("max", {}), ("count", {}),
+           ("mean", {"axis": 0}), ("mean", {"axis": 1})]
+    for op, kw in ops:
+        t_ma = _best(lambda: getattr(ma, op)(**kw))
+        t_pm = _best(lambda: getattr(pm, op)(**kw))
+        peak_ma = _peak(lambda: getattr(ma, op)(**kw))
+        peak_pm = _peak(lambda: getattr(pm, op)(**kw))
+        a, b = getattr(ma, op)(**kw), getattr(pm, op)(**kw)
+        if isinstance(b, PackedMaskedArray):
+            b = b.to_ma()
+        same = np.ma.allclose(a, b, rtol=1e-5)
+        label = op + (f"(axis={kw['axis']})" if kw else "")
+        print(f"{label:>14}: np.ma {t_ma * 1e3:7.1f} ms, peak {peak_ma / 2**20:6.1f} MiB | "
+              f"packed {t_pm * 1e3:7.1f} ms, peak {peak_pm / 2**20:5.1f} MiB | "
+              f"{t_ma / t_pm:4.1f}x | same: {same}")
+
+
+if __name__ == "__main__":
+    main()
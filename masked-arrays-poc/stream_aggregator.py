@@ -0,0 +1,208 @@
+import numpy as np
+import time
+import tracemalloc
+
+
+# Running per-channel statistics over an endless stream of sensor chunks.
+#
+# A chunk is a (rows, channels) block. MaskRules turns it into a bool mask
+# (True = drop, as in np.ma) from the same rules sections 1, 6 and 7 use:
+# sentinel values (masked_equal), NaN/Inf (masked_invalid) and a valid range
+# (masked_outside). No np.ma object is built.
+#
+# Per chunk, the rows are cut at window boundaries, and each piece is reduced
+# with np.<ufunc>.reduceat on a sentinel-filled copy: 0 for sums, +inf for
+# min, -inf for max. The number of Python steps is the number of windows the
+# chunk touches, not its length. The state is the running totals plus one
+# partial window, a few arrays of length `channels`, so memory does not
+# depend on how long the stream runs. Completed windows come back from
+# push() as summaries; flush() closes the last partial one.
+
+
+class MaskRules:
+    def __init__(self, sentinels=(), invalid=True, valid_range=None):
+        self.sentinels = tuple(sentinels)
+        self.invalid = invalid
+        self.valid_range = valid_range  # (lo, hi), both inclusive like masked_outside
+
+    def __call__(self, chunk):
+        mask = np.zeros(chunk.shape, dtype=bool)
+        for s in self.sentinels:
+            mask |= chunk == s
+        if self.invalid:
+            mask |= ~np.isfinite(chunk)
+        if self.valid_range is not None:
+            lo, hi = self.valid_range
+            mask |= (chunk < lo) | (chunk > hi)
+        return mask
+
+
+class _Stats:
+    # count / sum / min / max per channel for a span of rows
+    def __init__(self, channels):
+        self.count = np.zeros(channels, dtype=np.int64)
+        self.masked = np.zeros(channels, dtype=np.int64)
+        self.sum = np.zeros(channels)
+        self.min = np.full(channels, np.inf)
+        self.max = np.full(channels, -np.inf)
+
+    def add(self, count, masked, total, lo, hi):
+        self.count += count
+        self.masked += masked
+        self.sum += total
+        np.minimum(self.min, lo, out=self.min)
+        np.maximum(self.max, hi, out=self.max)
+
+    def summary(self, **extra):
+        seen = self.count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(seen, self.sum / self.count, np.nan)
+        return dict(extra, count=self.count.copy(), masked=self.masked.copy(), mean=mean,
+                    min=np.where(seen, self.min, np.nan), max=np.where(seen, self.max, np.nan))
+
+
+class StreamingAggregator:
+    def __init__(self, channels, rules=None, window=None):
+        self.channels = channels
+        self.rules = rules or MaskRules()
+        self.window = window  # rows per tumbling window, None for totals only
+        self.rows = 0
+        self.totals = _Stats(channels)
+        self._current = _Stats(channels)
+        self._window_start = 0
+
+    def push(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape(-1, 1) if self.channels == 1 else chunk.reshape(1, -1)
+        if chunk.shape[1] != self.channels:
+            raise ValueError(f"expected {self.channels} channels, got {chunk.shape[1]}")
+        n = len(chunk)
+        if n == 0:
+            return []
+
+        mask = self.rules(chunk)
+        valid = ~mask
+        if self.window:
+            first = -self.rows % self.window  # first row of the chunk that opens a new window
+            starts = np.unique(np.concatenate(([0], np.arange(first, n, self.window))))
+        else:
+            starts = np.array([0])
+        count = np.add.reduceat(valid, starts, axis=0, dtype=np.int64)
+        total = np.add.reduceat(np.where(mask, 0.0, chunk), starts, axis=0)
+        lo = np.minimum.reduceat(np.where(mask, np.inf, chunk), starts, axis=0)
+        hi = np.maximum.reduceat(np.where(mask, -np.inf, chunk), starts, axis=0)
+        masked = np.diff(np.append(starts, n))[:, None] - count
+
+        self.totals.add(count.sum(axis=0), masked.sum(axis=0), total.sum(axis=0), lo.min(axis=0), hi.max(axis=0))
+        done = []
+        ends = np.append(starts[1:], n)
+        for i, end in enumerate(ends):
+            self._current.add(count[i], masked[i], total[i], lo[i], hi[i])
+            if self.window and (self.rows + end) % self.window == 0:
+                done.append(self._close(self.rows + end))
+        self.rows += n
+        return done
+
+    def _close(self, stop):
+        summary = self._current.summary(start=self._window_start, stop=stop)
+        self._current = _Stats(self.channels)
+        self._window_start = stop
+        return summary
+
+    def flush(self):
+        # Summary of the partial window at the end of the stream, if any rows
+        if self.window and self.rows > self._window_start:
+            return [self._close(self.rows)]
+        return []
+
+    def summary(self):
+        return self.totals.summary(start=0, stop=self.rows)
+
+
+def main():
+    print("=== Streaming Masked Aggregation ===\n")
+
+    # 1. Sections 1 and 6 data, arriving in chunks
+
+    print("=== Sentinels and invalid values, chunked ===")
+
+    data = np.array([1, 2, -999, 4, 5, -999, 7, np.nan, 3.0, np.inf])
+    agg = StreamingAggregator(1, MaskRules(sentinels=(-999,)), window=4)
+    windows = []
+    for start in range(0, len(data), 3):
+        windows += agg.push(data[start:start + 3])
+    windows += agg.flush()
+
+    ref = np.ma.masked_invalid(np.ma.masked_equal(data, -999))
+    total = agg.summary()
+    print("Stream:", data, "in chunks of 3")
+    print(f"Totals: count {total['count'][0]}, masked {total['masked'][0]}, mean {total['mean'][0]:.4f}, "
+          f"min {total['min'][0]}, max {total['max'][0]}")
+    print(f"np.ma : count {ref.count()}, masked {ref.mask.sum()}, mean {ref.mean():.4f}, "
+          f"min {ref.min()}, max {ref.max()}")
+    for w in windows:
+        print(f"  rows {w['start']:>2}-{w['stop']:<2}: count {w['count'][0]}, mean {w['mean'][0]:.3f} "
+              f"| np.ma: {ref[w['start']:w['stop']].mean():.3f}")
+    print()
+
+    # 2. Range rule, like section 7's masked_outside
+
+    print("=== Valid range ===")
+
+    readings = np.array([10, 20, 30, 40, 50, 60, 70, 80])
+    ranged = StreamingAggregator(1, MaskRules(valid_range=(25, 65)))
+    ranged.push(readings[:5])
+    ranged.push(readings[5:])
+    s = ranged.summary()
+    print("Mean inside [25, 65]:", s["mean"][0], "| np.ma:", np.ma.masked_outside(readings, 25, 65).mean())
+    print()
+
+    # 3. Telemetry: many channels, long stream, fixed memory
+
+    print("=== Telemetry stream ===")
+
+    channels, rows_per_chunk, window = 16, 10_000, 60_000
+    rules = MaskRules(sentinels=(-999,), valid_range=(-50, 150))
+
+    def chunk_at(i):
+        c = np.random.default_rng(i).normal(20, 10, (rows_per_chunk, channels))
+        drop = np.random.default_rng(i + 1).random(c.shape)
+        c[drop < 0.02] = -999
+        c[(drop >= 0.02) & (drop < 0.025)] = np.nan
+        c[(drop >= 0.025) & (drop < 0.026)] = 500
+        return c
+
+    check = StreamingAggregator(channels, rules, window=window)
+    stream = [chunk_at(i) for i in range(12)]
+    got = [w for c in stream for w in check.push(c)] + check.flush()
+    full = np.concatenate(stream)
+    ref = np.ma.masked_outside(np.ma.masked_invalid(np.ma.masked_equal(full, -999)), -50, 150)
+    same = all(np.allclose(w["mean"], ref[w["start"]:w["stop"]].mean(axis=0)) and
+               np.array_equal(w["count"], ref[w["start"]:w["stop"]].count(axis=0)) for w in got)
+    print(f"{len(got)} windows of {window:,} rows match np.ma on the concatenated stream: {same}")
+
+    for n_chunks in (50, 200):
+        agg = StreamingAggregator(channels, rules, window=window)
+        tracemalloc.start()
+        elapsed, emitted = 0.0, 0
+        for i in range(n_chunks):
+            c = chunk_at(i)
+            start = time.perf_counter()
+            emitted += len(agg.push(c))
+            elapsed += time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        cells = n_chunks * rows_per_chunk * channels
+        print(f"{n_chunks * rows_per_chunk:>10,} rows x {channels}: {cells / elapsed / 1e6:5.1f} M cells/s, "
+              f"{emitted} windows, peak traced {peak / 2**20:.1f} MiB (one chunk is "
+              f"{rows_per_chunk * channels * 8 / 2**20:.1f} MiB)")
+
+    s = agg.summary()
+    print("Channel 0 totals: count", s["count"][0], "masked", s["masked"][0],
+          f"mean {s['mean'][0]:.3f} min {s['min'][0]:.2f} max {s['max'][0]:.2f}")
+    print("np.ma on the same stream would hold", f"{agg.rows * channels * 9 / 2**20:.0f} MiB of data + mask")
+
+
+if __name__ == "__main__":
+    main()
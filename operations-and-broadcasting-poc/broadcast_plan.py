@@ -0,0 +1,255 @@
+import numpy as np
+import heapq
+import logging
+import time
+
+
+# Plan a broadcast before running it: output shape, dtype, bytes to allocate,
+# and which operands get stretched along which axes (stride-0 expansions).
+#
+# plan() only looks at shapes and dtypes, so it can refuse an operation that
+# would exceed an allocation ceiling before any memory is touched, and it can
+# say *why* shapes do not line up (section 5's ValueError only says that they
+# do not). An "outer" plan is one whose output is larger than every operand:
+# valid, but exactly what (N, 1) + (N,) turns into by accident.
+#
+# Instrumentation is opt-in: inside `with BroadcastRecorder() as rec:` every
+# plan made through plan()/checked() is recorded, and the largest ones are
+# logged when the block exits.
+
+log = logging.getLogger(__name__)
+
+_recorders = []
+
+
+class BroadcastPlan:
+    def __init__(self, shapes, dtypes, out_shape, dtype, label=None):
+        self.shapes = shapes
+        self.dtypes = dtypes
+        self.out_shape = out_shape
+        self.dtype = dtype
+        self.label = label
+
+    @property
+    def size(self):
+        return int(np.prod(self.out_shape, dtype=np.int64))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    @property
+    def expansions(self):
+        # (operand, output axis, factor) for every axis an operand is repeated along
+        ndim = len(self.out_shape)
+        found = []
+        for i, shape in enumerate(self.shapes):
+            padded = (1,) * (ndim - len(shape)) + tuple(shape)
+            for axis, (dim, out) in enumerate(zip(padded, self.out_shape)):
+                if dim == 1 and out != 1:
+                    found.append((i, axis, out))
+        return found
+
+    @property
+    def is_outer(self):
+        sizes = [int(np.prod(s, dtype=np.int64)) for s in self.shapes]
+        return len(sizes) > 1 and self.size > max(sizes)
+
+    def describe(self):
+        lines = [f"{', '.join(str(tuple(s)) for s in self.shapes)} -> {self.out_shape} {self.dtype}, "
+                 f"{_fmt_bytes(self.nbytes)}" + (" [outer]" if self.is_outer else "")]
+        for i, axis, factor in self.expansions:
+            lines.append(f"  operand {i} {tuple(self.shapes[i])}: repeated x{factor:,} along axis {axis}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"BroadcastPlan({self.out_shape}, {self.dtype}, {_fmt_bytes(self.nbytes)})"
+
+
+def _fmt_bytes(n):
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if n < 1024 or unit == "TiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def _shape_dtype(operand):
+    # Arrays and scalars, or (shape, dtype) pairs for operands that do not exist yet.
+    # Also returns what dtype resolution should see: Python scalars stay "weak"
+    # (float32 array * 2.0 is float32), everything else is an empty array
+    if isinstance(operand, tuple) and len(operand) == 2 and isinstance(operand[0], tuple):
+        dtype = np.dtype(operand[1])
+        return operand[0], dtype, np.empty(0, dtype=dtype)
+    a = np.asarray(operand)
+    if isinstance(operand, (bool, int, float, complex)):
+        return a.shape, a.dtype, operand
+    return a.shape, a.dtype, np.empty(0, dtype=a.dtype)
+
+
+def _mismatch(shapes):
+    ndim = max(len(s) for s in shapes)
+    padded = [(1,) * (ndim - len(s)) + tuple(s) for s in shapes]
+    for axis in range(ndim):
+        dims = {p[axis] for p in padded} - {1}
+        if len(dims) > 1:
+            sizes = ", ".join(f"operand {i} has {p[axis]}" for i, p in enumerate(padded))
+            msg = f"shapes {' and '.join(str(tuple(s)) for s in shapes)} do not broadcast: " \
+                  f"axis {axis - ndim} ({sizes})"
+            # Common fix: a 1-D operand meant to line up with an earlier axis
+            for i, s in enumerate(shapes):
+                if len(s) == 1:
+                    for j, other in enumerate(padded):
+                        if j != i and s[0] in other[:-1]:
+                            k = other[:-1].index(s[0])
+                            hint = (-1,) + (1,) * (ndim - 1 - k)
+                            return f"{msg}; did you mean operand {i}.reshape{hint}?"
+            return msg
+    return None
+
+
+def plan(*operands, ufunc=None, dtype=None, label=None):
+    shapes, dtypes, probes = zip(*(_shape_dtype(op) for op in operands))
+    try:
+        out_shape = np.broadcast_shapes(*shapes)
+    except ValueError:
+        raise ValueError(_mismatch(shapes)) from None
+    if dtype is not None:
+        out_dtype = np.dtype(dtype)
+    elif ufunc is not None:
+        out_dtype = ufunc(*probes).dtype
+    else:
+        out_dtype = np.result_type(*probes)
+    p = BroadcastPlan(shapes, dtypes, out_shape, out_dtype, label)
+    for rec in _recorders:
+        rec.record(p)
+    return p
+
+
+def check(p, max_bytes):
+    if max_bytes is not None and p.nbytes > max_bytes:
+        raise MemoryError(f"broadcast would allocate {_fmt_bytes(p.nbytes)}, over the "
+                          f"{_fmt_bytes(max_bytes)} ceiling:\n{p.describe()}")
+    return p
+
+
+def checked(ufunc, *operands, max_bytes=None, label=None, **kwargs):
+    # ufunc(*operands) after planning it; refuses before allocating if over max_bytes
+    out = kwargs.get("out")
+    p = plan(*operands, ufunc=ufunc, dtype=kwargs.get("dtype"), label=label)
+    if out is None:
+        check(p, max_bytes)
+    return ufunc(*operands, **kwargs)
+
+
+class BroadcastRecorder:
+    def __init__(self, top=5, min_bytes=0):
+        self.top = top
+        self.min_bytes = min_bytes
+        self.count = 0
+        self.total_bytes = 0
+        self._heap = []  # (nbytes, sequence, plan), smallest first
+        self._seq = 0
+
+    def __enter__(self):
+        _recorders.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _recorders.remove(self)
+        if log.isEnabledFor(logging.INFO):
+            log.info("%d broadcasts planned, %s in total over %.2fs; largest:",
+                     self.count, _fmt_bytes(self.total_bytes), time.perf_counter() - self._start)
+            for p in self.largest():
+                log.info("%s%s", f"[{p.label}] " if p.label else "", p.describe())
+
+    def record(self, p):
+        self.count += 1
+        self.total_bytes += p.nbytes
+        if p.nbytes < self.min_bytes:
+            return
+        self._seq += 1
+        item = (p.nbytes, self._seq, p)
+        if len(self._heap) < self.top:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def largest(self):
+        return [p for _, _, p in sorted(self._heap, key=lambda item: item[0], reverse=True)]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    print("========================================")
+    print("       Broadcast Shape Planner")
+    print("========================================\n")
+
+    # 1. Section 2 / 5 shapes
+
+    print("--- 1. Plans ---\n")
+
+    matrix = np.array([[1, 2, 3], [4, 5, 6]])
+    print(plan(matrix, np.array([10, 20, 30])).describe())
+    print(plan(matrix, np.array([[1], [2]])).describe())
+    print(plan(matrix, 0.5, ufunc=np.multiply).describe())
+    print(plan(np.ones((1000, 1000), np.float32), 2.0, ufunc=np.multiply).describe(),
+          "| a * 2.0 is", (np.ones(1, np.float32) * 2.0).dtype)
+    print(plan(np.arange(3), np.arange(3), ufunc=np.true_divide).describe())
+
+    wrong_vector = np.array([10, 20])
+    try:
+        plan(matrix, wrong_vector)
+    except ValueError as e:
+        print("\nPlanner error:", e)
+    try:
+        matrix + wrong_vector
+    except ValueError as e:
+        print("NumPy error:  ", e)
+    print()
+
+    # 2. The accidental outer product, caught before allocation
+
+    print("--- 2. Allocation ceiling ---\n")
+
+    n = 200_000
+    column = ((n, 1), np.float64)   # described by shape/dtype only: nothing allocated
+    row = ((n,), np.float64)
+    p = plan(column, row)
+    print(p.describe())
+    print("Outer broadcast:", p.is_outer)
+
+    x = np.ones((n, 1))
+    y = np.ones(n)
+    start = time.perf_counter()
+    try:
+        checked(np.add, x, y, max_bytes=256 * 2**20)
+    except MemoryError as e:
+        print(f"Refused in {(time.perf_counter() - start) * 1e6:.0f} us:", e)
+    print("Intended (N,) + (N,):", checked(np.add, x[:, 0], y, max_bytes=256 * 2**20).shape)
+    print()
+
+    # 3. Opt-in instrumentation over a small pipeline
+
+    print("--- 3. Recording a run ---\n")
+
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(100_000, 16))
+    with BroadcastRecorder(top=3) as rec:
+        mean = checked(np.divide, data.sum(axis=0), len(data), label="mean")
+        centred = checked(np.subtract, data, mean, label="centre")
+        scaled = checked(np.multiply, centred, rng.random(16), label="weights")
+        checked(np.greater, scaled[:2_000, :1], scaled[:2_000, 0], label="mask (oops)")
+        for _ in range(100):
+            plan(((64,), np.float32), ((64,), np.float32))
+    print("Recorded:", rec.count, "plans; largest:", rec.largest())
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        plan(data, mean)
+    print(f"Planning overhead: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} us per call")
+
+
+if __name__ == "__main__":
+    main()
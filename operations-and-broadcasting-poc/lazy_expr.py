@@ -0,0 +1,270 @@
+import numpy as np
+import time
+import tracemalloc
+
+
+# Lazy broadcast arithmetic, evaluated block by block without full-size temporaries.
+#
+#   expr = (lazy(data) - mean) / std * weights    # records a graph, computes nothing
+#   result = evaluate(expr)                       # one pass over data
+#
+# Operators and ufunc calls (np.sqrt(expr), np.maximum(expr, 0), ...) on an
+# Expr build Op nodes. evaluate() walks the output in row blocks along axis 0:
+# every op writes into a small scratch buffer with out=, scratch buffers are
+# recycled as soon as their last consumer has run, and the root op writes
+# straight into the output. Peak extra memory is a few blocks instead of one
+# full-size array per operator.
+#
+# Subexpressions that do not vary along axis 0 (e.g. `mean * 2` over (cols,)
+# statistics) are computed once up front rather than once per block.
+
+BLOCK_BYTES = 256 * 2**10
+
+
+class Expr:
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs or ufunc.nout != 1:
+            return NotImplemented
+        return Op(ufunc, inputs)
+
+    def eval(self, out=None, block_bytes=BLOCK_BYTES):
+        return evaluate(self, out=out, block_bytes=block_bytes)
+
+
+def _binary(ufunc):
+    def forward(self, other):
+        return Op(ufunc, (self, other))
+
+    def reverse(self, other):
+        return Op(ufunc, (other, self))
+    return forward, reverse
+
+
+Expr.__add__, Expr.__radd__ = _binary(np.add)
+Expr.__sub__, Expr.__rsub__ = _binary(np.subtract)
+Expr.__mul__, Expr.__rmul__ = _binary(np.multiply)
+Expr.__truediv__, Expr.__rtruediv__ = _binary(np.true_divide)
+Expr.__pow__, Expr.__rpow__ = _binary(np.power)
+Expr.__neg__ = lambda self: Op(np.negative, (self,))
+Expr.__abs__ = lambda self: Op(np.absolute, (self,))
+
+
+class Leaf(Expr):
+    def __init__(self, value):
+        self.value = value if np.isscalar(value) else np.asarray(value)
+        self.shape = np.shape(self.value)
+        self.dtype = np.asarray(self.value).dtype
+
+    def _probe(self):
+        # What the ufunc type resolver should see: Python scalars stay "weak"
+        return self.value if np.isscalar(self.value) else np.empty(0, dtype=self.dtype)
+
+    def __repr__(self):
+        return f"Leaf(shape={self.shape}, dtype={self.dtype})"
+
+
+class Op(Expr):
+    def __init__(self, ufunc, args):
+        self.ufunc = ufunc
+        self.args = tuple(a if isinstance(a, Expr) else Leaf(a) for a in args)
+        self.shape = np.broadcast_shapes(*(a.shape for a in self.args))
+        self.dtype = ufunc(*(a._probe() for a in self.args)).dtype
+
+    def _probe(self):
+        return np.empty(0, dtype=self.dtype)
+
+    def __repr__(self):
+        return f"{self.ufunc.__name__}({', '.join(map(repr, self.args))})"
+
+
+def lazy(a):
+    return a if isinstance(a, Expr) else Leaf(a)
+
+
+def _hoist(node, shape, memo):
+    # Replace subtrees that are constant along axis 0 of the output by their value
+    key = id(node)
+    if key in memo:
+        return memo[key]
+    if isinstance(node, Op):
+        args = tuple(_hoist(a, shape, memo) for a in node.args)
+        varies = len(node.shape) == len(shape) and node.shape[0] == shape[0] and shape[0] > 1
+        if not varies:
+            node = Leaf(node.ufunc(*(a.value for a in args)))
+        elif any(new is not old for new, old in zip(args, node.args)):
+            node = Op(node.ufunc, args)
+    memo[key] = node
+    return node
+
+
+def _postorder(root):
+    order, seen = [], set()
+
+    def visit(node):
+        if id(node) in seen or not isinstance(node, Op):
+            return
+        seen.add(id(node))
+        for a in node.args:
+            visit(a)
+        order.append(node)
+    visit(root)
+    return order
+
+
+def evaluate(expr, out=None, block_bytes=BLOCK_BYTES):
+    expr = lazy(expr)
+    shape, dtype = expr.shape, expr.dtype
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expression has shape {shape}")
+    if not shape or shape[0] == 1:
+        # Nothing to block over
+        out[...] = _eager(expr)
+        return out
+
+    expr = _hoist(expr, shape, {})
+    if isinstance(expr, Leaf):
+        out[...] = expr.value
+        return out
+    order = _postorder(expr)
+
+    # Register allocation: how many consumers each op has, then reuse freed slots
+    users = {}
+    for node in order:
+        for a in node.args:
+            users[id(a)] = users.get(id(a), 0) + 1
+    slot_of, free, slot_dtypes, plan = {}, {}, [], []
+    for node in order:
+        args = []
+        for a in node.args:
+            if isinstance(a, Op):
+                args.append(("slot", slot_of[id(a)]))
+                users[id(a)] -= 1
+                if users[id(a)] == 0:
+                    free.setdefault(a.dtype, []).append(slot_of[id(a)])
+            elif np.isscalar(a.value):
+                args.append(("const", a.value))
+            else:
+                args.append(("leaf", np.broadcast_to(a.value, shape)))
+        if node is expr:
+            slot = "out"
+        elif free.get(node.dtype):
+            slot = free[node.dtype].pop()
+        else:
+            slot = len(slot_dtypes)
+            slot_dtypes.append(node.dtype)
+        slot_of[id(node)] = slot
+        plan.append((node.ufunc, args, slot))
+
+    row_bytes = max(1, int(np.prod(shape[1:], dtype=np.int64))) * max(
+        [out.dtype.itemsize] + [d.itemsize for d in slot_dtypes])
+    step = max(1, block_bytes // row_bytes)
+    buffers = [np.empty((min(step, shape[0]),) + shape[1:], dtype=d) for d in slot_dtypes]
+
+    for start in range(0, shape[0], step):
+        stop = min(start + step, shape[0])
+        rows = stop - start
+        for ufunc, args, slot in plan:
+            inputs = [buffers[v][:rows] if kind == "slot" else v[start:stop] if kind == "leaf" else v
+                      for kind, v in args]
+            target = out[start:stop] if slot == "out" else buffers[slot][:rows]
+            ufunc(*inputs, out=target)
+    return out
+
+
+def _eager(node):
+    if isinstance(node, Leaf):
+        return node.value
+    return node.ufunc(*(_eager(a) for a in node.args))
+
+
+def measure(fn, repeat=3):
+    # (result, best seconds, peak bytes allocated by fn beyond what was live before).
+    # Timed without tracemalloc, which slows down every allocation it records.
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    print("========================================")
+    print("     Fused Lazy Expression Evaluator")
+    print("========================================\n")
+
+    rng = np.random.default_rng(0)
+
+    # 1. Section 3 normalization and weighting as one expression
+
+    print("--- 1. Section 3 data ---\n")
+
+    data = np.array([[50, 60, 70], [55, 65, 75], [60, 70, 80]])
+    mean = data.mean(axis=0)
+    std = data.std(axis=0)
+    weights = np.array([0.2, 0.3, 0.5])
+
+    expr = (lazy(data) - mean) / std * weights
+    print("Graph:", expr)
+    print("Normalized * weights:\n", evaluate(expr))
+    print("Same as eager:", np.allclose(evaluate(expr), (data - mean) / std * weights))
+    print("ufuncs on Expr stay lazy:", np.sqrt(lazy(data) * 2.0 + 1))
+    print()
+
+    # 2. Peak memory and time vs eager at scale
+
+    print("--- 2. Eager vs fused ---\n")
+
+    rows, cols = 4_000_000, 8
+    data = rng.normal(60, 10, size=(rows, cols))
+    mean = data.mean(axis=0)
+    std = data.std(axis=0)
+    weights = rng.random(cols)
+    print(f"data: {rows:,} x {cols} float64 = {data.nbytes / 2**20:.0f} MiB")
+
+    def eager():
+        normalized = (data - mean) / std
+        return normalized * weights
+
+    def fused():
+        return evaluate((lazy(data) - mean) / std * weights)
+
+    ref, eager_s, eager_peak = measure(eager)
+    res, fused_s, fused_peak = measure(fused)
+    print(f"eager: {eager_s * 1e3:7.1f} ms, peak {eager_peak / 2**20:6.0f} MiB")
+    print(f"fused: {fused_s * 1e3:7.1f} ms, peak {fused_peak / 2**20:6.0f} MiB  (output itself is "
+          f"{res.nbytes / 2**20:.0f} MiB)")
+    print("Results equal:", np.allclose(res, ref))
+
+    out = np.empty_like(data)
+    _, into_s, into_peak = measure(lambda: evaluate((lazy(data) - mean) / std * weights, out=out))
+    print(f"fused into preallocated out: {into_s * 1e3:.1f} ms, peak {into_peak / 2**20:.2f} MiB")
+
+    # Longer chains save more: one temporary per operator in eager mode
+    x = data[:, 0].copy()
+    chain = lambda v: np.sqrt(np.abs((v - 60.0) * 0.1 + 1.0)) * 2.0 - 1.0
+    ref, eager_s, eager_peak = measure(lambda: chain(x))
+    res, fused_s, fused_peak = measure(lambda: evaluate(chain(lazy(x))))
+    print(f"\n6-op chain on {len(x):,} elements: eager {eager_s * 1e3:.1f} ms / {eager_peak / 2**20:.0f} MiB, "
+          f"fused {fused_s * 1e3:.1f} ms / {fused_peak / 2**20:.0f} MiB, equal: {np.allclose(res, ref)}")
+    print()
+
+    # 3. Block size
+
+    print("--- 3. Block size ---\n")
+
+    for block in [16 * 2**10, 64 * 2**10, 256 * 2**10, 1 * 2**20, 8 * 2**20, 64 * 2**20]:
+        start = time.perf_counter()
+        evaluate((lazy(data) - mean) / std * weights, out=out, block_bytes=block)
+        print(f"block {block // 2**10:6d} KiB: {(time.perf_counter() - start) * 1e3:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import numpy as np
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+
+# Chunked parallel execution of element-wise expressions.
+#
+# An expression is any callable fn(*inputs, out=out): a ufunc such as np.add,
+# or a function that chains ufuncs with out= itself. The output is split into
+# chunks along axis 0 and every chunk is computed straight into its slice of a
+# preallocated output.
+#
+#   backend="thread":  NumPy releases the GIL inside ufunc loops, so threads
+#                      share the arrays as they are.
+#   backend="process": inputs and output live in multiprocessing.shared_memory
+#                      blocks owned by the executor; workers attach by name and
+#                      rebuild (broadcast) views from offset, shape and strides.
+#                      Arrays from ex.empty()/ex.asarray() are used in place;
+#                      any other array is staged into a temporary block that
+#                      map() frees before returning. When map() allocates the
+#                      output itself it is a private array. Workers attach a
+#                      block for one chunk and close it again, so they never
+#                      keep a block map() has freed.
+#
+# close() unlinks every block but unmaps none that an array still views: a
+# block is unmapped when the last view of it goes away, so arrays from
+# empty()/asarray() stay valid after close().
+#
+# Process workers only receive picklable arguments, so process-backend
+# expressions must be module-level functions.
+
+_MIN_CHUNK_BYTES = 256 * 2**10
+
+
+def _attach(name):
+    try:
+        # Python 3.13+: do not let the worker's resource tracker own the block
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _view(spec, blocks):
+    name, offset, shape, dtype, strides = spec
+    if name not in blocks:
+        blocks[name] = _attach(name)
+    return np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf, offset=offset, strides=strides)
+
+
+def _run_chunk(fn, in_specs, out_spec, start, stop):
+    blocks = {}  # attached for this chunk only
+    views = [_view(spec, blocks)[start:stop] for spec in (*in_specs, out_spec)]
+    fn(*views[:-1], out=views[-1])
+    del views  # no view may outlive the mapping
+    for shm in blocks.values():
+        shm.close()
+
+
+class ParallelExecutor:
+    def __init__(self, workers=None, backend="thread", chunks_per_worker=4):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"backend must be 'thread' or 'process', got {backend!r}")
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.chunks_per_worker = chunks_per_worker
+        self._blocks = []  # SharedMemory blocks owned by this executor
+        if backend == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+        self._release(0)
+
+    def empty(self, shape, dtype=np.float64):
+        if self.backend == "thread":
+            return np.empty(shape, dtype=dtype)
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self._blocks.append(shm)
+        a = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        # Views of a keep it alive; unmap the block only once they are all gone
+        weakref.finalize(a, shm.close)
+        return a
+
+    def asarray(self, a):
+        a = np.asarray(a)
+        if self.backend == "thread" or self._spec(a) is not None:
+            return a
+        shared = self.empty(a.shape, a.dtype)
+        shared[...] = a
+        return shared
+
+    def _spec(self, a):
+        # (name, offset, shape, dtype, strides) if a lies inside one of our blocks
+        addr = a.__array_interface__["data"][0]
+        for shm in self._blocks:
+            base = np.frombuffer(shm.buf, dtype=np.uint8).__array_interface__["data"][0]
+            if base <= addr < base + shm.size:
+                return shm.name, addr - base, a.shape, a.dtype.str, a.strides
+        return None
+
+    def _chunks(self, shape, itemsize):
+        rows = shape[0] if shape else 1
+        row_bytes = itemsize * int(np.prod(shape[1:], dtype=np.int64))
+        count = min(rows, self.workers * self.chunks_per_worker,
+                    max(1, rows * row_bytes // _MIN_CHUNK_BYTES))
+        bounds = np.linspace(0, rows, max(count, 1) + 1).astype(np.int64)
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def map(self, fn, *arrays, out=None, dtype=None):
+        arrays = [np.asarray(a) for a in arrays]
+        shape = np.broadcast_shapes(*(a.shape for a in arrays))
+        if out is None:
+            if dtype is None and isinstance(fn, np.ufunc):
+                # Let the ufunc's own type resolution pick the output dtype (int / int -> float)
+                dtype = fn(*(np.empty(0, dtype=a.dtype) for a in arrays)).dtype
+            # A private array, not a shared block: the result may outlive the executor
+            out = np.empty(shape, dtype or np.result_type(*arrays))
+        elif out.shape != shape:
+            raise ValueError(f"out has shape {out.shape}, expected broadcast shape {shape}")
+        if not shape:
+            fn(*arrays, out=out)
+            return out
+        chunks = self._chunks(shape, out.dtype.itemsize)
+
+        if self.backend == "thread":
+            inputs = [np.broadcast_to(a, shape) for a in arrays]
+            futures = [self._pool.submit(fn, *(a[start:stop] for a in inputs), out=out[start:stop])
+                       for start, stop in chunks]
+            for f in futures:
+                f.result()
+            return out
+
+        # Blocks staged here (inputs and output not already shared) are freed on return
+        first_block = len(self._blocks)
+        inputs = target = None
+        try:
+            inputs = [np.broadcast_to(self.asarray(a), shape) for a in arrays]
+            target = out if self._spec(out) is not None else self.empty(shape, out.dtype)
+            in_specs = [self._spec(a) for a in inputs]
+            out_spec = self._spec(target)
+            futures = [self._pool.submit(_run_chunk, fn, in_specs, out_spec, start, stop)
+                       for start, stop in chunks]
+            for f in futures:
+                f.result()
+            if target is not out:
+                out[...] = target
+            return out
+        finally:
+            del inputs, target
+            self._release(first_block)
+
+    def _release(self, first):
+        # Unlink now; each block is unmapped by its finalizer (see empty())
+        for shm in self._blocks[first:]:
+            shm.unlink()
+        del self._blocks[first:]
+
+
+# Expressions used by the demo (module level so process workers can unpickle them)
+
+def hypot_expr(x, y, out):
+    np.multiply(x, x, out=out)
+    out += y * y
+    np.sqrt(out, out=out)
+
+
+def poly_expr(x, out):
+    # Horner: ((3x + 2)x - 5)x + 1
+    np.multiply(x, 3.0, out=out)
+    out += 2.0
+    out *= x
+    out -= 5.0
+    out *= x
+    out += 1.0
+
+
+def main():
+    print("========================================")
+    print("   Parallel Element-wise Execution")
+    print("========================================\n")
+
+    rng = np.random.default_rng(0)
+
+    # 1. Section 1 operations through the executor
+
+    print("--- 1. Element-wise ---\n")
+
+    a = np.array([1, 2, 3])
+    b = np.array([10, 20, 30])
+    with ParallelExecutor(workers=2) as ex:
+        print("a + b:", ex.map(np.add, a, b))
+        print("a / b:", ex.map(np.divide, a, b))
+        matrix = np.array([[1, 2, 3], [4, 5, 6]])
+        print("Matrix + Vector (broadcast):\n", ex.map(np.add, matrix, np.array([10, 20, 30])))
+    print()
+
+    # 2. Same 1M-element x + y as section 4, on both backends
+
+    print("--- 2. Section 4 workload ---\n")
+
+    size = 1_000_000
+    x = rng.random(size)
+    y = rng.random(size)
+    for backend in ["thread", "process"]:
+        with ParallelExecutor(backend=backend) as ex:
+            xs, ys = ex.asarray(x), ex.asarray(y)
+            out = ex.empty(size)
+            ex.map(np.add, xs, ys, out=out)  # warm up the pool
+            start = time.perf_counter()
+            ex.map(np.add, xs, ys, out=out)
+            elapsed = time.perf_counter() - start
+            print(f"{backend:7s}: {elapsed * 1e3:.2f} ms | equal to x + y: {np.array_equal(out, x + y)}")
+    start = time.perf_counter()
+    x + y
+    print(f"x + y:   {(time.perf_counter() - start) * 1e3:.2f} ms")
+    print()
+
+    # 3. Scaling from 1 to N workers on a larger expression
+
+    print("--- 3. Scaling ---\n")
+
+    size = 20_000_000
+    x = rng.random(size)
+    y = rng.random(size)
+    ref = np.sqrt(x * x + y * y)
+    start = time.perf_counter()
+    np.sqrt(x * x + y * y)
+    print(f"{size:,} elements, sqrt(x*x + y*y); single-threaded eager: "
+          f"{(time.perf_counter() - start) * 1e3:.0f} ms")
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores} | {c for c in (8, 16) if c <= cores})
+    print(f"{'backend':8s} {'workers':>7s} {'ms':>8s} {'speedup':>8s} {'GB/s':>6s}")
+    for backend in ["thread", "process"]:
+        base = None
+        for workers in counts:
+            with ParallelExecutor(workers=workers, backend=backend) as ex:
+                xs, ys = ex.asarray(x), ex.asarray(y)
+                out = ex.empty(size)
+                ex.map(hypot_expr, xs[:1000], ys[:1000], out=out[:1000])
+                start = time.perf_counter()
+                ex.map(hypot_expr, xs, ys, out=out)
+                elapsed = time.perf_counter() - start
+                assert np.allclose(out, ref)
+            base = base or elapsed
+            gbs = 3 * x.nbytes / elapsed / 1e9
+            print(f"{backend:8s} {workers:7d} {elapsed * 1e3:8.1f} {base / elapsed:8.2f} {gbs:6.2f}")
+    print(f"({cores} core(s) available; worker counts above that only add overhead)")
+
+    with ParallelExecutor(backend="process") as ex:
+        out = ex.map(poly_expr, x[:1_000_000])
+        print("\nHorner polynomial on the process pool matches:",
+              np.allclose(out, ((3 * x[:1_000_000] + 2) * x[:1_000_000] - 5) * x[:1_000_000] + 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import numpy as np
+import tempfile
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# External merge sort for arrays (typically np.memmap) larger than RAM.
+#
+# 1. Runs: the input is cut into RAM-sized runs; a thread pool sorts them
+#    (np.sort / np.argsort release the GIL) and spills each one to disk as raw
+#    binary (ndarray.tofile), keys and payload in separate files.
+# 2. Merge: every run is read back through np.memmap one block at a time. Per
+#    step, the smallest last key among the buffered blocks is a bound below
+#    which every buffer is complete, so the parts <= bound of all buffers are
+#    cut with searchsorted, concatenated, ordered with one vectorized sort and
+#    written out.
+#
+# Stability: pieces are concatenated in run order and equal keys keep that
+# order. Runs after the bound-defining run only give up keys strictly below
+# the bound, since the defining run may still hold more keys equal to it.
+# argsort therefore matches np.argsort(kind="stable"), and key/value sorts
+# keep the input order of equal keys. NaNs sort last, as in np.sort.
+
+_SORT_TEMPS = 3  # keys + permutation + gathered payload while sorting a run
+
+
+def stable_argsort(k):
+    # np.argsort(k, kind="stable"), built on the much faster unstable sorts:
+    # small-range integers sort a packed (key, position) int64; anything else
+    # is argsorted unstably and only the runs of equal keys are put back in
+    # position order.
+    n = len(k)
+    if k.dtype.itemsize <= 2 and k.dtype.kind in "iub":
+        return np.argsort(k, kind="stable")  # radix sort, already fast
+    if n and (k.dtype.kind in "ib" or (k.dtype.kind == "u" and k.dtype.itemsize < 8)):
+        lo, hi = int(k.min()), int(k.max())
+        if (hi - lo + 1) * n < 2**63:
+            packed = (k.astype(np.int64) - lo) * n + np.arange(n)
+            packed.sort()
+            return packed % n
+    order = np.argsort(k)
+    sk = k[order]
+    tie = sk[1:] == sk[:-1]
+    if k.dtype.kind in "fc":
+        nan = np.isnan(sk)
+        tie |= nan[1:] & nan[:-1]
+    if tie.any():
+        group = np.cumsum(np.concatenate(([True], ~tie)))
+        members = np.flatnonzero(np.concatenate(([False], tie)) | np.concatenate((tie, [False])))
+        fix = np.lexsort((order[members], group[members]))
+        order[members] = order[members][fix]
+    return order
+
+
+def _per_elem(keys, payload):
+    return keys.dtype.itemsize + (0 if payload is None else 8 + payload.dtype.itemsize)
+
+
+def _sort_runs(keys, payload, index, run_elems, workers, tmpdir):
+    n = len(keys)
+    bounds = [(s, min(s + run_elems, n)) for s in range(0, n, run_elems)]
+
+    def sort_run(i):
+        s, e = bounds[i]
+        k = np.array(keys[s:e])
+        key_path = os.path.join(tmpdir, f"run{i:05d}.keys")
+        if payload is None and not index:
+            k.sort()
+            k.tofile(key_path)
+            return key_path, None, e - s
+        order = stable_argsort(k)
+        k[order].tofile(key_path)
+        p = order + s if index else np.asarray(payload[s:e])[order]
+        pay_path = os.path.join(tmpdir, f"run{i:05d}.payload")
+        p.tofile(pay_path)
+        return key_path, pay_path, e - s
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(sort_run, range(len(bounds))))
+
+
+def _merge_runs(runs, key_dtype, pay_dtype, keys_out, pay_out, block):
+    key_mms = [np.memmap(k, dtype=key_dtype, mode="r", shape=(n,)) for k, _, n in runs]
+    pay_mms = [np.memmap(p, dtype=pay_dtype, mode="r", shape=(n,)) if p else None for _, p, n in runs]
+    lengths = [n for _, _, n in runs]
+    pos = [0] * len(runs)        # next unread element of each run
+    bufk = [key_dtype.type(0)[None][:0]] * len(runs)
+    bufp = [None] * len(runs)
+    live = list(range(len(runs)))
+    out = 0
+    steps = 0
+
+    while live:
+        for i in live:
+            if len(bufk[i]) == 0:
+                stop = min(pos[i] + block, lengths[i])
+                bufk[i] = np.array(key_mms[i][pos[i]:stop])
+                if pay_mms[i] is not None:
+                    bufp[i] = np.array(pay_mms[i][pos[i]:stop])
+                pos[i] = stop
+        live = [i for i in live if len(bufk[i])]
+        if not live:
+            break
+
+        constrained = [i for i in live if pos[i] < lengths[i]]
+        if constrained:
+            lasts = np.array([bufk[i][-1] for i in constrained])
+            first = constrained[int(np.argsort(lasts, kind="stable")[0])]
+            bound = bufk[first][-1:]
+            cuts = [int(np.searchsorted(bufk[i], bound, side="right" if i <= first else "left")[0])
+                    for i in live]
+        else:
+            cuts = [len(bufk[i]) for i in live]
+
+        ks = [bufk[i][:c] for i, c in zip(live, cuts)]
+        merged = np.concatenate(ks)
+        if pay_out is not None:
+            order = stable_argsort(merged)
+            keys_out[out:out + len(merged)] = merged[order]
+            pays = np.concatenate([bufp[i][:c] for i, c in zip(live, cuts)])
+            pay_out[out:out + len(merged)] = pays[order]
+        else:
+            merged.sort()
+            keys_out[out:out + len(merged)] = merged
+        out += len(merged)
+        for i, c in zip(live, cuts):
+            bufk[i] = bufk[i][c:]
+            if bufp[i] is not None:
+                bufp[i] = bufp[i][c:]
+        steps += 1
+
+    del key_mms, pay_mms
+    return steps
+
+
+def _external(keys, keys_out, payload=None, index=False, payload_out=None,
+              ram_budget=256 * 2**20, workers=None, tmpdir=None):
+    n = len(keys)
+    workers = workers or os.cpu_count() or 1
+    if keys_out is not None and len(keys_out) != n:
+        raise ValueError(f"output has {len(keys_out)} elements, input has {n}")
+    per_elem = _per_elem(keys, payload) + (8 if index else 0)
+    run_elems = max(1, ram_budget // (workers * per_elem * _SORT_TEMPS))
+    own_tmp = tmpdir is None
+    tmpdir = tempfile.mkdtemp(prefix="extsort-") if own_tmp else tmpdir
+    stats = {"n": n, "run_elems": run_elems, "workers": workers}
+    try:
+        start = time.perf_counter()
+        runs = _sort_runs(keys, payload, index, run_elems, workers, tmpdir)
+        stats["runs"] = len(runs)
+        stats["run_seconds"] = time.perf_counter() - start
+        stats["spilled_bytes"] = sum(os.path.getsize(k) + (os.path.getsize(p) if p else 0) for k, p, _ in runs)
+
+        start = time.perf_counter()
+        if keys_out is None:
+            # argsort only: keys still have to be merged, into a scratch file
+            keys_out = np.memmap(os.path.join(tmpdir, "merged.keys"), dtype=keys.dtype, mode="w+", shape=(n,))
+        # The merge holds one block per run plus the merged step (~2x)
+        block = max(1, ram_budget // (2 * max(1, len(runs)) * per_elem))
+        pay_dtype = np.dtype(np.int64) if index else (payload.dtype if payload is not None else None)
+        stats["merge_steps"] = _merge_runs(runs, keys.dtype, pay_dtype, keys_out, payload_out, block)
+        stats["merge_seconds"] = time.perf_counter() - start
+        for out in (keys_out, payload_out):
+            if isinstance(out, np.memmap):
+                out.flush()
+        del keys_out
+    finally:
+        if own_tmp:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    stats["seconds"] = stats["run_seconds"] + stats["merge_seconds"]
+    return stats
+
+
+def external_sort(keys, out, ram_budget=256 * 2**20, workers=None, tmpdir=None):
+    return _external(keys, out, ram_budget=ram_budget, workers=workers, tmpdir=tmpdir)
+
+
+def external_argsort(keys, out, ram_budget=256 * 2**20, workers=None, tmpdir=None, keys_out=None):
+    # Same result as np.argsort(keys, kind="stable"), written to out (int64);
+    # keys_out, if given, also receives the sorted keys
+    return _external(keys, keys_out, index=True, payload_out=out,
+                     ram_budget=ram_budget, workers=workers, tmpdir=tmpdir)
+
+
+def external_sort_by_key(keys, values, keys_out, values_out, ram_budget=256 * 2**20, workers=None, tmpdir=None):
+    # Stable sort of (key, value) records by key
+    if len(values) != len(keys):
+        raise ValueError("keys and values must have the same length")
+    return _external(keys, keys_out, payload=values, payload_out=values_out,
+                     ram_budget=ram_budget, workers=workers, tmpdir=tmpdir)
+
+
+def main():
+    print("=" * 40)
+    print("        External Merge Sort")
+    print("=" * 40, "\n")
+
+    tmpdir = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+
+    # 1. Section 1 / 4 arrays through the external path (tiny runs)
+
+    print("--- 1. Small arrays ---\n")
+
+    arr = np.array([42, 7, 18, 3, 25, 11, 33, 1])
+    out = np.empty_like(arr)
+    external_sort(arr, out, ram_budget=3 * 8 * _SORT_TEMPS)
+    print("External sort:", out, "| np.sort:", np.sort(arr))
+
+    data = np.array([3, 1, 2, 1, 3, 2])
+    idx = np.empty(len(data), dtype=np.int64)
+    s = external_argsort(data, idx, ram_budget=2 * 16 * _SORT_TEMPS)
+    print("External stable argsort:", idx, f"({s['runs']} runs) | mergesort argsort:",
+          np.argsort(data, kind="mergesort"))
+    print()
+
+    # 2. Memmapped input larger than the RAM budget
+
+    print("--- 2. Memmapped keys ---\n")
+
+    def make(name, n, dtype, fill):
+        mm = np.memmap(os.path.join(tmpdir, name), dtype=dtype, mode="w+", shape=(n,))
+        for s in range(0, n, 5_000_000):
+            mm[s:s + 5_000_000] = fill(min(5_000_000, n - s))
+        mm.flush()
+        return np.memmap(os.path.join(tmpdir, name), dtype=dtype, mode="r", shape=(n,))
+
+    n = 20_000_000
+    keys = make("keys.bin", n, np.int64, lambda m: rng.integers(0, 1_000_000, m))  # many duplicates
+    budget = 64 * 2**20
+    print(f"{n:,} int64 keys = {keys.nbytes / 2**20:.0f} MiB on disk, RAM budget {budget / 2**20:.0f} MiB")
+
+    out = np.memmap(os.path.join(tmpdir, "sorted.bin"), dtype=np.int64, mode="w+", shape=(n,))
+    s = external_sort(keys, out, ram_budget=budget)
+    print(f"sort:    {s['runs']} runs, {s['merge_steps']} merge steps, runs {s['run_seconds']:.2f}s + "
+          f"merge {s['merge_seconds']:.2f}s | matches np.sort: {np.array_equal(out, np.sort(keys))}")
+
+    idx = np.memmap(os.path.join(tmpdir, "order.bin"), dtype=np.int64, mode="w+", shape=(n,))
+    s = external_argsort(keys, idx, ram_budget=budget)
+    print(f"argsort: {s['runs']} runs, {s['seconds']:.2f}s | matches np.argsort(kind='stable'): "
+          f"{np.array_equal(idx, np.argsort(keys, kind='stable'))}")
+
+    values = make("values.bin", n, np.float32, lambda m: rng.random(m, dtype=np.float32))
+    k_out = np.memmap(os.path.join(tmpdir, "k.bin"), dtype=np.int64, mode="w+", shape=(n,))
+    v_out = np.memmap(os.path.join(tmpdir, "v.bin"), dtype=np.float32, mode="w+", shape=(n,))
+    s = external_sort_by_key(keys, values, k_out, v_out, ram_budget=budget)
+    ref = np.argsort(keys, kind="stable")
+    print(f"key+value: {s['seconds']:.2f}s | values follow keys stably: {np.array_equal(v_out, values[ref])}")
+    del out, idx, k_out, v_out
+    print()
+
+    # 3. Throughput by size
+
+    print("--- 3. Throughput ---\n")
+
+    print(f"{'n':>12s} {'dtype':>8s} {'runs':>5s} {'external s':>11s} {'MB/s':>7s} {'np.sort s':>10s}")
+    for n, dtype in [(1_000_000, np.float64), (10_000_000, np.float64), (40_000_000, np.float64),
+                     (40_000_000, np.int32)]:
+        if np.dtype(dtype).kind == "f":
+            src = make(f"in{n}.bin", n, dtype, lambda m: rng.random(m))
+        else:
+            src = make(f"in{n}.bin", n, dtype, lambda m: rng.integers(-2**31, 2**31 - 1, m))
+        dst = np.memmap(os.path.join(tmpdir, f"out{n}.bin"), dtype=dtype, mode="w+", shape=(n,))
+        s = external_sort(src, dst, ram_budget=budget)
+        start = time.perf_counter()
+        ref = np.sort(src)
+        mem_s = time.perf_counter() - start
+        assert np.array_equal(dst, ref)
+        print(f"{n:12,} {np.dtype(dtype).name:>8s} {s['runs']:5d} {s['seconds']:11.2f} "
+              f"{src.nbytes / s['seconds'] / 1e6:7.0f} {mem_s:10.2f}")
+        del src, dst, ref
+    print("(np.sort needs the whole array in RAM; the external sort stays within the budget)\n")
+
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
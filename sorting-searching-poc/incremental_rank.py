@@ -0,0 +1,192 @@
+import numpy as np
+import time
+
+
+# Ranks over a growing array, without re-sorting it on every append.
+#
+# The structure keeps the values in sorted order plus, alongside them, the
+# insertion id of every value (what np.argsort of the whole array would say).
+# An appended batch of m values is sorted on its own (m log m), located in the
+# sorted buffer with one searchsorted (m log n), and merged in a single O(n + m)
+# pass: a boolean mask marks where the new values land, and the old values
+# fill the remaining slots in order. No Python loop over elements.
+#
+# New values go after equal old ones and a batch is sorted stably, so the order
+# is exactly np.argsort(all_values, kind="stable"): ties rank by arrival.
+#
+# A batch must cast to the stored dtype within its kind (np.can_cast with
+# "same_kind"): floats are not silently truncated into an integer structure.
+#
+# Queries are batched searchsorted/gather calls on the sorted buffer. Large
+# batches of rank() queries are sorted first, so the searches walk the buffer
+# in order instead of missing cache on every probe:
+#   rank(v)       how many values are below v (side="right": at or below)
+#   value_at(r)   the r-th smallest value
+#   percentile(q) same as np.percentile(all_values, q) (linear interpolation)
+#   ranks()       the rank of every value by insertion id, as in section 2
+
+_SORT_QUERIES_ABOVE = 4096
+
+
+class IncrementalRank:
+    def __init__(self, dtype=np.float64):
+        self.sorted = np.empty(0, dtype=dtype)
+        self.ids = np.empty(0, dtype=np.int64)  # insertion id of each sorted value
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def extend(self, batch):
+        batch = np.asarray(batch)
+        if not np.can_cast(batch.dtype, self.sorted.dtype, "same_kind"):
+            raise TypeError(f"cannot add {batch.dtype} values to a {self.sorted.dtype} rank structure")
+        batch = batch.astype(self.sorted.dtype, copy=False).ravel()
+        n, m = len(self.sorted), len(batch)
+        if m == 0:
+            return self
+        order = np.argsort(batch, kind="stable")
+        batch_sorted = batch[order]
+        # Final slot of the i-th smallest new value: its place among the old
+        # values (after equal ones) plus the i new values before it
+        slots = np.searchsorted(self.sorted, batch_sorted, side="right") + np.arange(m)
+        is_new = np.zeros(n + m, dtype=bool)
+        is_new[slots] = True
+
+        merged = np.empty(n + m, dtype=self.sorted.dtype)
+        merged[slots] = batch_sorted
+        merged[~is_new] = self.sorted
+        ids = np.empty(n + m, dtype=np.int64)
+        ids[slots] = order + n
+        ids[~is_new] = self.ids
+        self.sorted, self.ids = merged, ids
+        return self
+
+    def rank(self, values, side="left"):
+        values = np.asarray(values)
+        if values.size < _SORT_QUERIES_ABOVE:
+            return np.searchsorted(self.sorted, values, side=side)
+        flat = values.ravel()
+        order = np.argsort(flat)
+        ranks = np.empty(flat.shape, dtype=np.intp)
+        ranks[order] = np.searchsorted(self.sorted, flat[order], side=side)
+        return ranks.reshape(values.shape)
+
+    def value_at(self, ranks):
+        ranks = np.asarray(ranks)
+        if np.any((ranks < -len(self)) | (ranks >= len(self))):
+            raise IndexError(f"rank out of range for {len(self)} values")
+        return self.sorted[ranks]
+
+    def percentile(self, q):
+        if len(self) == 0:
+            raise ValueError("percentile of an empty rank structure")
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 100)):
+            raise ValueError("percentiles must be in the range [0, 100]")
+        pos = q / 100 * (len(self) - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, len(self) - 1)
+        frac = pos - lo
+        below, above = self.sorted[lo], self.sorted[hi]
+        return below + (above - below) * frac
+
+    def percentile_of(self, values):
+        # Share of values strictly below each value, in percent
+        return 100.0 * self.rank(values) / len(self)
+
+    def ranks(self):
+        # 0-based rank of every value in insertion order (ties by arrival)
+        ranks = np.empty(len(self), dtype=np.int64)
+        ranks[self.ids] = np.arange(len(self))
+        return ranks
+
+
+def full_ranks(values):
+    # The section 2 recipe on the whole array: argsort + scatter
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values))
+    return ranks
+
+
+def main():
+    print("=" * 40)
+    print("      Incremental Rank Maintenance")
+    print("=" * 40, "\n")
+
+    # 1. Section 2 values, then an appended batch
+
+    print("--- 1. Section 2, appended ---\n")
+
+    values = np.array([50, 10, 40, 20, 30])
+    r = IncrementalRank(values.dtype).extend(values)
+    print("Values:", values)
+    print("Ranks (0-based):", r.ranks(), "| argsort + scatter:", full_ranks(values))
+
+    more = np.array([35, 10, 60])
+    r.extend(more)
+    everything = np.concatenate((values, more))
+    print("Appended:", more, "-> sorted buffer:", r.sorted)
+    print("Ranks:", r.ranks(), "| recomputed:", full_ranks(everything), "(ties by arrival)")
+    print("rank(35):", r.rank(35), "| rank(10, 'right'):", r.rank(10, "right"),
+          "| value_at([0, -1]):", r.value_at([0, -1]))
+    print("Percentiles 25/50/90:", r.percentile([25, 50, 90]),
+          "| np.percentile:", np.percentile(everything, [25, 50, 90]))
+    print("Percentile of 40:", r.percentile_of(40))
+    print()
+
+    # 2. Leaderboard: a big array receiving a few thousand scores at a time
+
+    print("--- 2. Leaderboard updates ---\n")
+
+    rng = np.random.default_rng(0)
+    n, batch, rounds = 10_000_000, 5_000, 10
+    board = rng.normal(1_000, 200, n).round(1)
+    batches = [rng.normal(1_000, 200, batch).round(1) for _ in range(rounds)]
+
+    start = time.perf_counter()
+    inc = IncrementalRank().extend(board)
+    print(f"Initial build of {n:,} scores: {time.perf_counter() - start:.2f}s")
+
+    # Both loops produce the same thing per batch: every rank, the top score, p99
+    start = time.perf_counter()
+    for b in batches:
+        inc.extend(b)
+        inc_ranks = inc.ranks()
+        top = inc.value_at(-1)
+        p99 = inc.percentile(99)
+    inc_s = (time.perf_counter() - start) / rounds
+
+    everything = board
+    start = time.perf_counter()
+    for b in batches:
+        everything = np.concatenate((everything, b))
+        ranks = full_ranks(everything)
+        top = everything[np.argmax(everything)]
+        p99 = np.percentile(everything, 99)
+    full_s = (time.perf_counter() - start) / rounds
+
+    print(f"{rounds} batches of {batch:,} into {n:,} scores, per batch:")
+    print(f"  incremental merge : {inc_s * 1e3:7.1f} ms")
+    print(f"  argsort + scatter : {full_s * 1e3:7.1f} ms  ({full_s / inc_s:.1f}x slower)")
+    print("Same ranks:", np.array_equal(inc_ranks, ranks),
+          "| same top:", inc.value_at(-1) == top, "| same p99:", bool(np.isclose(inc.percentile(99), p99)))
+
+    queries = rng.normal(1_000, 200, 1_000_000)
+    start = time.perf_counter()
+    got = inc.rank(queries)
+    sorted_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    ref = np.searchsorted(inc.sorted, queries)
+    plain_ms = (time.perf_counter() - start) * 1e3
+    print(f"rank() of {len(queries):,} scores: {sorted_ms:.0f} ms (queries sorted first) | "
+          f"plain searchsorted: {plain_ms:.0f} ms | same: {np.array_equal(got, ref)}")
+
+    try:
+        IncrementalRank(np.int64).extend([1.5])
+    except TypeError as e:
+        print("Float batch into an int structure:", e)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import numpy as np
+import tempfile
+import json
+import os
+import shutil
+import time
+
+from external_sort import external_argsort, stable_argsort
+
+
+# Persistent sorted-key index over a key column.
+#
+# Built once, stored as a directory of .npy files next to the data:
+#   keys.npy   the keys in sorted order
+#   perm.npy   row numbers, so keys[perm] == sorted keys (stable argsort)
+#   fence.npy  optional: every `fence`-th sorted key
+# open() maps them with np.load(mmap_mode="r"): nothing is read until used.
+#
+# Every query takes a whole batch. Equality and range queries are a pair of
+# searchsorted calls giving the [left, right) run of matching positions;
+# rows() expands those runs into row numbers without a Python loop.
+#
+# With a fence array the top level of every search happens in the small fence
+# (cache resident), and the rest is a vectorized bisection inside one
+# fence-sized block of keys: a few gathers per query instead of ~log2(n)
+# scattered reads into the big column.
+#
+# Large batches are sorted before searching instead, so consecutive searches
+# walk the key column in order and share the pages the previous one touched;
+# that beats the fence (~3.5x over unsorted np.searchsorted on 50M keys), so
+# the fence only serves batches below _SORT_QUERIES_ABOVE.
+
+_SORT_QUERIES_ABOVE = 4096
+
+
+class SortedIndex:
+    def __init__(self, keys, perm, fence=None, fence_every=None):
+        self.keys = keys
+        self.perm = perm
+        self.fence = fence
+        self.fence_every = fence_every
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, column, directory, fence_every=None, ram_budget=None):
+        # ram_budget: sort out of core (external merge sort) instead of in RAM
+        os.makedirs(directory, exist_ok=True)
+        n = len(column)
+        keys = np.lib.format.open_memmap(os.path.join(directory, "keys.npy"), mode="w+",
+                                         dtype=column.dtype, shape=(n,))
+        perm = np.lib.format.open_memmap(os.path.join(directory, "perm.npy"), mode="w+",
+                                         dtype=np.int64, shape=(n,))
+        if ram_budget is None:
+            perm[:] = stable_argsort(np.asarray(column))
+            keys[:] = np.asarray(column)[perm]
+        else:
+            external_argsort(column, perm, ram_budget=ram_budget, keys_out=keys)
+        keys.flush()
+        perm.flush()
+        if fence_every:
+            np.save(os.path.join(directory, "fence.npy"), np.array(keys[::fence_every]))
+        with open(os.path.join(directory, "index.json"), "w") as f:
+            json.dump({"n": n, "dtype": column.dtype.str, "fence_every": fence_every}, f)
+        del keys, perm
+        return cls.open(directory)
+
+    @classmethod
+    def open(cls, directory):
+        with open(os.path.join(directory, "index.json")) as f:
+            meta = json.load(f)
+        keys = np.load(os.path.join(directory, "keys.npy"), mmap_mode="r")
+        perm = np.load(os.path.join(directory, "perm.npy"), mmap_mode="r")
+        fence = None
+        if meta["fence_every"]:
+            fence = np.load(os.path.join(directory, "fence.npy"))
+        return cls(keys, perm, fence, meta["fence_every"])
+
+    def searchsorted(self, values, side="left"):
+        # Not cast to the key dtype: 20.5 must land after 20, and 2**40 must
+        # not overflow an int32 index; comparisons happen in the common dtype
+        values = np.asarray(values)
+        if values.size >= _SORT_QUERIES_ABOVE:
+            # Visit the key column in order: sort the batch, search, scatter back
+            flat = values.ravel()
+            order = np.argsort(flat)
+            found = np.empty(flat.shape, dtype=np.intp)
+            found[order] = np.searchsorted(self.keys, flat[order], side=side)
+            return found.reshape(values.shape)
+        if self.fence is None:
+            return np.searchsorted(self.keys, values, side=side)
+        return self._fenced(values, side)
+
+    def _fenced(self, values, side):
+        # First position p with keys[p] >= v (left) or keys[p] > v (right)
+        f, n = self.fence_every, len(self.keys)
+        j = np.searchsorted(self.fence, values, side=side)
+        # keys[(j-1)*f] is before the answer and keys[j*f] at or after it
+        lo = np.where(j > 0, (j - 1) * f + 1, 0)
+        hi = np.minimum(j * f, n)
+        shape = values.shape
+        lo, hi, values = lo.ravel(), hi.ravel(), values.ravel()
+        # NumPy sorts NaN last; plain < and <= would put a NaN query anywhere
+        nan_aware = np.result_type(self.keys, values).kind in "fc"
+        active = np.flatnonzero(lo < hi)
+        while len(active):
+            l, h, v = lo[active], hi[active], values[active]
+            mid = (l + h) // 2
+            km = self.keys[mid]
+            before = km < v if side == "left" else km <= v
+            if nan_aware:
+                nan_v = v != v
+                before |= nan_v & (km == km) if side == "left" else nan_v
+            lo[active] = np.where(before, mid + 1, l)
+            hi[active] = np.where(before, h, mid)
+            active = active[lo[active] < hi[active]]
+        return lo.reshape(shape)
+
+    def equal_range(self, values):
+        # [left, right) positions of every value's duplicate run
+        return self.searchsorted(values, "left"), self.searchsorted(values, "right")
+
+    def count(self, values):
+        left, right = self.equal_range(values)
+        return right - left
+
+    def contains(self, values):
+        return self.count(values) > 0
+
+    def first_row(self, values):
+        # Row of the first (lowest row number) match, -1 where absent
+        left, right = self.equal_range(values)
+        hit = right > left
+        rows = np.full(np.shape(left), -1, dtype=np.int64)
+        rows[hit] = self.perm[left[hit]]
+        return rows
+
+    def range(self, lo, hi, inclusive=(True, False)):
+        # Positions [left, right) of keys within lo..hi, per query
+        left = self.searchsorted(lo, "left" if inclusive[0] else "right")
+        right = self.searchsorted(hi, "right" if inclusive[1] else "left")
+        return left, np.maximum(right, left)
+
+    def rows(self, left, right):
+        # Row numbers of all runs, CSR style: rows[offsets[i]:offsets[i+1]] belong to query i
+        left, right = np.ravel(left), np.ravel(right)
+        counts = right - left
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        total = int(offsets[-1])
+        positions = np.arange(total) - np.repeat(offsets[:-1] - left, counts)
+        return np.asarray(self.perm[positions]), offsets
+
+
+def main():
+    print("=" * 40)
+    print("        Persistent Sorted Index")
+    print("=" * 40, "\n")
+
+    tmpdir = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+
+    # 1. Section 5 arrays, queried in batches
+
+    print("--- 1. Section 5 arrays ---\n")
+
+    column = np.array([30, 10, 90, 20, 50, 40, 70, 80, 60])
+    index = SortedIndex.build(column, os.path.join(tmpdir, "small"))
+    print("Column:", column, "| sorted keys:", np.asarray(index.keys), "| perm:", np.asarray(index.perm))
+    print("Insert index for [35, 5, 95]:", index.searchsorted([35, 5, 95]),
+          "| np.searchsorted:", np.searchsorted(np.sort(column), [35, 5, 95]))
+
+    dupes = SortedIndex.build(np.array([20, 40, 10, 20, 30, 20]), os.path.join(tmpdir, "dupes"), fence_every=2)
+    left, right = dupes.equal_range([20, 25, 40])
+    print("Duplicate runs of [20, 25, 40]: left", left, "right", right)
+    rows, offsets = dupes.rows(left, right)
+    print("Rows holding 20:", rows[offsets[0]:offsets[1]], "| first row of each:", dupes.first_row([20, 25, 40]))
+    left, right = dupes.range([15, 0], [30, 100], inclusive=(True, True))
+    print("Counts in [15, 30] and [0, 100]:", right - left)
+    print("Float queries on int keys, [19.5, 20.5]:", dupes.searchsorted([19.5, 20.5]),
+          "| np.searchsorted:", np.searchsorted(np.asarray(dupes.keys), [19.5, 20.5]))
+    print()
+
+    # 2. Large column on disk
+
+    print("--- 2. Large column ---\n")
+
+    n = 50_000_000
+    column = rng.integers(0, 10 * n, n)
+    path = os.path.join(tmpdir, "big")
+    start = time.perf_counter()
+    index = SortedIndex.build(column, path, fence_every=256)
+    print(f"Built index on {n:,} int64 keys in {time.perf_counter() - start:.2f}s "
+          f"({(index.keys.nbytes + index.perm.nbytes) / 2**20:.0f} MiB on disk, "
+          f"fence {index.fence.nbytes / 2**10:.0f} KiB)")
+
+    start = time.perf_counter()
+    plain = SortedIndex.open(path)
+    plain.fence = None
+    print(f"open(): {(time.perf_counter() - start) * 1e3:.2f} ms, keys are {type(plain.keys).__name__}")
+
+    queries = rng.integers(0, 10 * n, 1_000_000)
+    ref_left = np.searchsorted(np.asarray(index.keys), queries)
+    start = time.perf_counter()
+    np.searchsorted(index.keys, queries)
+    elapsed = time.perf_counter() - start
+    print(f"np.searchsorted on the keys, one batch : {len(queries) / elapsed / 1e6:.1f} M/s")
+    for label, idx, batch in [("fence 256, batches of 1,000", index, 1_000),
+                              ("no fence,  batches of 1,000", plain, 1_000),
+                              ("sorted queries, one batch  ", index, len(queries))]:
+        start = time.perf_counter()
+        parts = [idx.equal_range(queries[s:s + batch]) for s in range(0, len(queries), batch)]
+        elapsed = time.perf_counter() - start
+        left, right = np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+        print(f"{label}: {len(queries) / elapsed / 1e6:.1f} M/s point lookups (2 searches each) | "
+              f"matches np.searchsorted: {np.array_equal(left, ref_left)}")
+    print(f"hits: {int((right > left).sum()):,}; each is a true match:",
+          bool(np.all(column[index.first_row(queries[right > left])] == queries[right > left])))
+
+    start = time.perf_counter()
+    for q in queries[:10_000]:
+        np.searchsorted(index.keys, q)
+    loop = (time.perf_counter() - start) / 10_000
+    print(f"scalar searchsorted loop (section 5 style): {1 / loop / 1e6:.2f} M/s")
+
+    lo = rng.integers(0, 10 * n, 100_000)
+    hi = lo + 1_000
+    start = time.perf_counter()
+    left, right = index.range(lo, hi)
+    rows, offsets = index.rows(left, right)
+    elapsed = time.perf_counter() - start
+    i = 7
+    expected = np.flatnonzero((column >= lo[i]) & (column < hi[i]))
+    print(f"{len(lo):,} range queries -> {len(rows):,} rows in {elapsed * 1e3:.0f} ms | "
+          f"query {i} matches a full scan: {np.array_equal(np.sort(rows[offsets[i]:offsets[i + 1]]), expected)}")
+
+    external = SortedIndex.build(column[:5_000_000], os.path.join(tmpdir, "ext"), ram_budget=32 * 2**20)
+    print("Out-of-core build matches in-RAM build:",
+          np.array_equal(external.perm, np.argsort(column[:5_000_000], kind="stable")))
+
+    del index, plain, external
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import numpy as np
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Top-k over a stream of score chunks, keeping global indices.
+#
+# The accumulator holds at most k candidates. A chunk is first filtered
+# against the current k-th best score (once the buffer is full nothing below
+# it can get in, which skips most of every chunk after the first few), then
+# the survivors and the buffer are cut back to k with np.argpartition.
+#
+# Ties are broken by the smaller global index, so the result does not depend
+# on chunk boundaries or on the order states are merged in: it is exactly
+# np.lexsort((indices, -scores))[:k] of the whole stream. NaN scores are
+# ignored.
+
+
+class TopK:
+    def __init__(self, k, largest=True):
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        self.k = k
+        self.largest = largest
+        self.values = np.empty(0)
+        self.indices = np.empty(0, dtype=np.int64)
+        self.seen = 0  # elements pushed so far; next default global index
+
+    def _better(self, a, b):
+        return a > b if self.largest else a < b
+
+    def push(self, chunk, indices=None):
+        chunk = np.asarray(chunk).ravel()
+        if indices is None:
+            indices = np.arange(self.seen, self.seen + len(chunk), dtype=np.int64)
+            fresh = True  # every new index is larger than all kept ones
+        else:
+            indices = np.asarray(indices, dtype=np.int64).ravel()
+            if len(indices) != len(chunk):
+                raise ValueError("chunk and indices must have the same length")
+            fresh = False
+        self.seen += len(chunk)
+
+        if len(self.values) == 0:
+            self.values = self.values.astype(chunk.dtype)
+        if len(self.values) == self.k:
+            worst = self.values.min() if self.largest else self.values.max()
+            # Equal scores only win on a smaller index, which fresh indices never have
+            keep = self._better(chunk, worst) if fresh else (self._better(chunk, worst) | (chunk == worst))
+        else:
+            keep = ~np.isnan(chunk) if chunk.dtype.kind == "f" else None
+        if keep is not None:
+            chunk, indices = chunk[keep], indices[keep]
+        if len(chunk) == 0:
+            return self
+        self._reduce(np.concatenate((self.values, chunk)), np.concatenate((self.indices, indices)))
+        return self
+
+    def merge(self, other):
+        if other.k != self.k or other.largest != self.largest:
+            raise ValueError("can only merge accumulators with the same k and direction")
+        self.seen += other.seen
+        if len(other.values):
+            self._reduce(np.concatenate((self.values, other.values)),
+                         np.concatenate((self.indices, other.indices)))
+        return self
+
+    def _reduce(self, values, indices):
+        k, n = self.k, len(values)
+        if n > k:
+            # No negation: -values wraps around for unsigned dtypes
+            if self.largest:
+                threshold = values[np.argpartition(values, n - k)[n - k]]
+            else:
+                threshold = values[np.argpartition(values, k - 1)[k - 1]]
+            inside = self._better(values, threshold)
+            ties = np.flatnonzero(values == threshold)
+            need = k - int(inside.sum())
+            if len(ties) > need:
+                ties = ties[np.argsort(indices[ties], kind="stable")[:need]]
+            chosen = np.concatenate((np.flatnonzero(inside), ties))
+            values, indices = values[chosen], indices[chosen]
+        self.values, self.indices = values, indices
+
+    def result(self):
+        # (values, global indices), best first; ties by smaller index
+        order = _best_first(self.values, self.indices, self.largest)
+        return self.values[order], self.indices[order]
+
+
+def _best_first(values, indices, largest):
+    # Order by value (descending if largest), ties by ascending index. Indices
+    # are non-negative int64, so negating them is safe where values may not be.
+    if largest:
+        return np.lexsort((-indices, values))[::-1]
+    return np.lexsort((indices, values))
+
+
+def topk_oneshot(scores, k, largest=True):
+    # Reference over the full array, same tie rule
+    scores = np.asarray(scores)
+    valid = np.flatnonzero(~np.isnan(scores)) if scores.dtype.kind == "f" else np.arange(len(scores))
+    s = scores[valid]
+    order = _best_first(s, valid, largest)[:k]
+    return s[order], valid[order]
+
+
+def main():
+    print("=" * 40)
+    print("       Streaming Top-k Selection")
+    print("=" * 40, "\n")
+
+    # 1. Section 10 scores, arriving in chunks
+
+    print("--- 1. Section 10, chunked ---\n")
+
+    np.random.seed(42)
+    scores = np.random.uniform(0, 100, size=1_000_000)
+    k = 5
+
+    top = TopK(k)
+    for start in range(0, len(scores), 10_000):
+        top.push(scores[start:start + 10_000])
+    values, indices = top.result()
+    print(f"Top {k} from 1M scores: {np.round(values, 4)}")
+    print("Global indices:", indices)
+
+    top_idx = np.argpartition(scores, -k)[-k:]
+    one_shot = np.sort(scores[top_idx])[::-1]
+    print("Same as argpartition one-shot:", np.array_equal(values, one_shot))
+    print("Bottom 3:", np.round(TopK(3, largest=False).push(scores).result()[0], 4))
+    print()
+
+    # 2. Ties, NaNs, and merged worker states
+
+    print("--- 2. Ties and merges ---\n")
+
+    ties = np.array([5, 9, 9, 1, 9, np.nan, 7, 9, 3], dtype=float)
+    t = TopK(3)
+    for start in range(0, len(ties), 2):
+        t.push(ties[start:start + 2])
+    print("Stream:", ties)
+    print("Top 3 (ties -> smaller index):", t.result(), "| reference:", topk_oneshot(ties, 3))
+
+    unsigned = np.array([5, 0, 200, 3, 7, 1], dtype=np.uint32)
+    print("uint32", unsigned, "top 2:", TopK(2).push(unsigned).result()[0])
+
+    rng = np.random.default_rng(0)
+    stream = rng.integers(0, 1_000, size=2_000_000).astype(np.float64)  # many duplicates
+    shards = np.array_split(np.arange(len(stream)), 4)
+
+    def worker(idx):
+        acc = TopK(100)
+        for start in range(0, len(idx), 50_000):
+            part = idx[start:start + 50_000]
+            acc.push(stream[part], indices=part)
+        return acc
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        states = list(pool.map(worker, shards[::-1]))  # merge order should not matter
+    merged = TopK(100)
+    for s in states:
+        merged.merge(s)
+    ref = topk_oneshot(stream, 100)
+    got = merged.result()
+    print("4 workers merged == one-shot (values and indices):",
+          np.array_equal(got[0], ref[0]) and np.array_equal(got[1], ref[1]), "| seen:", merged.seen)
+    print()
+
+    # 3. Throughput
+
+    print("--- 3. Throughput ---\n")
+
+    n = 20_000_000
+    data = rng.random(n)
+    for k, chunk in [(10, 100_000), (1_000, 100_000), (100_000, 1_000_000)]:
+        acc = TopK(k)
+        start = time.perf_counter()
+        for s in range(0, n, chunk):
+            acc.push(data[s:s + chunk])
+        stream_s = time.perf_counter() - start
+        start = time.perf_counter()
+        idx = np.argpartition(data, -k)[-k:]
+        oneshot_s = time.perf_counter() - start
+        same = np.array_equal(np.sort(acc.result()[1]), np.sort(idx))
+        print(f"k={k:>7,} chunk={chunk:>9,}: streaming {n / stream_s / 1e6:6.1f} M/s, "
+              f"buffer {acc.values.nbytes + acc.indices.nbytes:>9,} B | "
+              f"one-shot argpartition {n / oneshot_s / 1e6:6.1f} M/s on {data.nbytes / 2**20:.0f} MiB | same: {same}")
+
+
+if __name__ == "__main__":
+    main()